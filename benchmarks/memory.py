@@ -0,0 +1,77 @@
+# Memory benchmark: parses every .snbt file of a generated pack in a fresh
+# interpreter, keeps all trees alive and reports the peak RSS.
+#
+#   python -m benchmarks.memory [--chapters 60] [--quests 60] [--lines 10]
+#
+# "trees" is the peak RSS growth caused by parsing and holding the trees,
+# on top of the interpreter with ftbquest_profiler already imported.
+from argparse import ArgumentParser
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from .pack import PackGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = (("ply", "yacc"), ("scanner", "descent"))
+
+CODE = """
+import glob, json, resource, sys
+from ftbquest_profiler.snbt_parser import SNBTParser
+
+def peak_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+parser = SNBTParser(lexer=sys.argv[1], engine=sys.argv[2])
+files = sorted(glob.glob(sys.argv[3] + "/quests/**/*.snbt", recursive=True))
+base = peak_mb()
+trees = []
+for file_path in files:
+    with open(file_path, "r", encoding="utf-8") as f:
+        trees.append(parser.parse_file(f))
+print(json.dumps({"files": len(files), "base": base, "peak": peak_mb()}))
+"""
+
+
+def run_case(lexer: str, engine: str, pack_dir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    result = subprocess.run(
+        [sys.executable, "-c", CODE, lexer, engine, pack_dir],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="FTBQuestProfiler memory benchmark")
+    arg_parser.add_argument("--chapters", type=int, default=60)
+    arg_parser.add_argument("--quests", type=int, default=60)
+    arg_parser.add_argument("--lines", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pack_dir:
+        PackGenerator(args.chapters, args.quests, args.lines).write(pack_dir)
+        size = sum(
+            os.path.getsize(os.path.join(dir_path, file_name))
+            for dir_path, _, file_names in os.walk(os.path.join(pack_dir, "quests"))
+            for file_name in file_names
+        )
+        print(f"pack: {size / (1024 * 1024):.1f} MB of .snbt")
+        for lexer, engine in CASES:
+            result = run_case(lexer, engine, pack_dir)
+            print(
+                f"{lexer + '+' + engine:>16}: peak {result['peak']:7.1f} MB, "
+                f"trees {result['peak'] - result['base']:7.1f} MB "
+                f"({result['files']} files)"
+            )
+
+
+if __name__ == "__main__":
+    main()
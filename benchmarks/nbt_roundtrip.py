@@ -0,0 +1,316 @@
+# Round-trip check of the binary NBT codec: every .snbt file of a generated
+# pack, a document of the edge values of every tag type, and a generated
+# document of float, double and integer scalars and lists, is parsed,
+# written as NBT, read back and written as text again (by SNBTWriter and by
+# pretty_str), which must give the text written from the parsed tree.
+# Before that, a tree of the edge values text cannot hold (inf, nan,
+# exponents, names with NUL) is checked value by value, type and bits, and
+# the modified UTF-8 of NUL and non-BMP characters byte by byte.
+#
+#   python -m benchmarks.nbt_roundtrip [--chapters 10] [--quests 10]
+#                                      [--floats 2000] [--seed 1]
+#
+# NBT has no boolean, a Boolean comes back as the Byte 1b or 0b; the text
+# it is compared with is written with booleans as bytes. Fails (exit code 1)
+# on the first value or file that differs.
+from argparse import ArgumentParser
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+
+from ftbquest_profiler.snbt import (
+    NBTReader,
+    NBTWriter,
+    SNBT,
+    SNBTArray,
+    SNBTList,
+    SNBTWriter,
+)
+from ftbquest_profiler.snbt.basic_type import *
+from ftbquest_profiler.snbt.nbt import decode_mutf8, encode_mutf8
+from ftbquest_profiler.snbt_parser import SNBTParser
+from .pack import PackGenerator
+
+
+def as_nbt_types(value):
+    # the tree as NBT reads it back: booleans as bytes
+    if isinstance(value, Boolean):
+        return Byte(1 if value else 0)
+    if isinstance(value, SNBT):
+        return SNBT((key, as_nbt_types(item)) for key, item in value.items())
+    if isinstance(value, SNBTList):
+        return SNBTList(as_nbt_types(item) for item in value)
+    return value
+
+
+# text -> its modified UTF-8: NUL as C0 80, a character outside the BMP as
+# the 3-byte forms of its two surrogates
+MUTF8 = {
+    "": b"",
+    "a\x00b": b"a\xc0\x80b",
+    "\x00": b"\xc0\x80",
+    "\u00e9": b"\xc3\xa9",
+    "\u4e16\u754c": b"\xe4\xb8\x96\xe7\x95\x8c",
+    "\U0001f600": b"\xed\xa0\xbd\xed\xb8\x80",
+    "\U00010000": b"\xed\xa0\x80\xed\xb0\x80",
+    "\U0010ffff": b"\xed\xaf\xbf\xed\xbf\xbf",
+}
+# float32 edge values and what they read back as: the shortest decimal of
+# the same float32
+FLOAT_EDGES = [
+    (0.0, 0.0),
+    (-0.0, -0.0),
+    (0.1, 0.1),
+    (-2.5, -2.5),
+    (1.401298464324817e-45, 1e-45),
+    (1.1754943508222875e-38, 1.1754944e-38),
+    (3.4028234663852886e38, 3.4028235e38),
+    (math.inf, math.inf),
+    (-math.inf, -math.inf),
+    (math.nan, math.nan),
+]
+DOUBLE_EDGES = [
+    0.0,
+    -0.0,
+    0.1,
+    5e-324,
+    2.2250738585072014e-308,
+    1.7976931348623157e308,
+    math.inf,
+    -math.inf,
+    math.nan,
+]
+# the same values in text, for the text round trip; array elements are
+# written without a suffix and read back as Int, so the long array stays in
+# the int range here, edge_tree covers the full range of longs
+EDGE_DOCUMENT = """{
+\tbyte_min: -128b
+\tbyte_max: 127b
+\tshort_min: -32768s
+\tshort_max: 32767s
+\tint_min: -2147483648
+\tint_max: 2147483647
+\tlong_min: -9223372036854775808L
+\tlong_max: 9223372036854775807L
+\tfloat_zero: -0.0f
+\tfloat_tenth: 0.1f
+\tdouble_zero: -0.0d
+\tdouble_tenth: 0.1d
+\tbool: true
+\tnul: "a\x00b"
+\tnon_bmp: "\U0001f600 \u4e16\u754c \U0010ffff"
+\tempty_string: ""
+\tempty_list: [ ]
+\tempty_bytes: [B; ]
+\tempty_ints: [I; ]
+\tempty_longs: [L; ]
+\tbytes: [B; -128b, 0b, 127b]
+\tints: [I; -2147483648, 0, 2147483647]
+\tlongs: [L; -2147483648L, 0L, 2147483647L]
+\tlists: [[ ], [1, 2], [[ ]]]
+\tcompounds: [{ }, {a: {b: {c: [{d: 1b}]}}}]
+\tpacked: [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, -2147483648]
+\tnested: {
+\t\tstrings: ["a\x00b", "\U0001f600", ""]
+\t\tempty: { }
+\t}
+}
+"""
+
+
+def edge_tree() -> tuple[SNBT, SNBT]:
+    # (a tree of every tag type at its edges, the tree NBT reads back)
+    written = SNBT()
+    expected = SNBT()
+
+    def add(key: str, value, back=None) -> None:
+        written[key] = value
+        expected[key] = value if back is None else back
+
+    for cls, bits in ((Byte, 8), (Short, 16), (Int, 32), (Long, 64)):
+        name = cls.__name__.lower()
+        add(f"{name}_min", cls(-(2 ** (bits - 1))))
+        add(f"{name}_max", cls(2 ** (bits - 1) - 1))
+    for i, (value, back) in enumerate(FLOAT_EDGES):
+        add(f"float_{i}", Float(value), Float(back))
+    for i, value in enumerate(DOUBLE_EDGES):
+        add(f"double_{i}", Double(value))
+    add(
+        "floats",
+        SNBTList(Float(value) for value, _ in FLOAT_EDGES),
+        SNBTList(Float(back) for _, back in FLOAT_EDGES),
+    )
+    # long enough to be packed
+    add(
+        "packed_floats",
+        SNBTList(Float(value) for value, _ in FLOAT_EDGES * 2),
+        SNBTList(Float(back) for _, back in FLOAT_EDGES * 2),
+    )
+    add("doubles", SNBTList(map(Double, DOUBLE_EDGES * 2)))
+    add("true", Boolean(True), Byte(1))
+    add("false", Boolean(False), Byte(0))
+    add("booleans", SNBTList([Boolean(True), Byte(2)]), SNBTList([Byte(1), Byte(2)]))
+    add("strings", SNBTList(map(String, MUTF8)))
+    for text in MUTF8:
+        # as names as well
+        add(text, String(text))
+    add("empty_list", SNBTList())
+    add("empty_lists", SNBTList([SNBTList(), SNBTList([Int(1)])]))
+    for typecode in ("b", "i", "l"):
+        add(f"empty_array_{typecode}", SNBTArray(typecode))
+    add("bytes", SNBTArray("b", [-128, 0, 127]))
+    add("ints", SNBTArray("i", [-(2**31), 0, 2**31 - 1]))
+    add("longs", SNBTArray("l", [-(2**63), 0, 2**63 - 1]))
+    add("empty_compound", SNBT())
+    add(
+        "nested",
+        SNBT(a=SNBT(b=SNBT(c=SNBTList([SNBT(d=Byte(1)), SNBT()])))),
+    )
+    return written, expected
+
+
+def same(want, have) -> bool:
+    # equal, of the same type, and for floats of the same bits (-0.0, nan)
+    if type(want) is not type(have):
+        return False
+    if isinstance(want, SNBT):
+        return list(want) == list(have) and all(
+            same(want[key], have[key]) for key in want
+        )
+    if isinstance(want, SNBTList):
+        return len(want) == len(have) and all(map(same, want, have))
+    if isinstance(want, SNBTArray):
+        return want.typecode == have.typecode and want == have
+    if isinstance(want, float):
+        return struct.pack(">d", want) == struct.pack(">d", have)
+    return want == have
+
+
+def check_values() -> None:
+    for text, data in MUTF8.items():
+        assert encode_mutf8(text) == data, f"encode_mutf8({text!r})"
+        assert decode_mutf8(data) == text, f"decode_mutf8({data!r})"
+    written, expected = edge_tree()
+    for name in ("", "\x00", "\U0001f600"):
+        data = NBTWriter().dumps(written, name)
+        back_name, back = NBTReader().loads_named(data)
+        assert back_name == name, f"root name {name!r} read back as {back_name!r}"
+        for key in expected:
+            assert same(expected[key], back[key]), (
+                f"{key!r}: {expected[key]!r} read back as {back[key]!r}"
+            )
+        assert list(back) == list(expected), "compound order"
+        # and written again, the same bytes
+        assert NBTWriter().dumps(back, name) == NBTWriter().dumps(expected, name)
+    assert back["packed_floats"].values is not None, "long float list not packed"
+
+
+def random_number(r: random.Random, float32: bool) -> float:
+    # a double of any precision, or a float of up to 6 significant digits,
+    # all of which a float32 keeps; SNBT numbers have no exponent, so only
+    # magnitudes that print without one
+    while True:
+        value = r.uniform(-1, 1) * 10 ** r.randint(-3, 12)
+        if float32:
+            value = float(f"{value:.{r.randint(1, 6)}g}")
+        if "e" not in repr(value):
+            return value
+
+
+def float_document(count: int, seed: int) -> str:
+    # scalars, short lists and lists long enough to be packed
+    r = random.Random(seed)
+    lines = ["{"]
+    for i in range(count):
+        lines.append(f"\tf{i}: {random_number(r, True)!r}f")
+        lines.append(f"\td{i}: {random_number(r, False)!r}d")
+        lines.append(f"\ts{i}: {r.randint(-(10**6), 10**6) / 1000}f")
+    for length in (3, 40):
+        for i in range(count // length):
+            floats = ", ".join(f"{random_number(r, True)!r}f" for _ in range(length))
+            doubles = ", ".join(f"{random_number(r, False)!r}d" for _ in range(length))
+            ints = ", ".join(str(r.randint(-100, 100)) for _ in range(length))
+            lines.append(f"\tfl{length}_{i}: [{floats}]")
+            lines.append(f"\tdl{length}_{i}: [{doubles}]")
+            lines.append(f"\til{length}_{i}: [{ints}]")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def report(name: str, expected: str, got: str) -> None:
+    for line, (want, have) in enumerate(
+        zip(expected.splitlines(), got.splitlines()), 1
+    ):
+        if want != have:
+            print(f"[ERROR] {name}:{line}: {want.strip()!r} != {have.strip()!r}")
+            return
+    print(f"[ERROR] {name}: text differs in length")
+
+
+def check(name: str, text: str, parser: SNBTParser) -> bool:
+    writer = SNBTWriter()
+    tree = parser.parse(text)
+    expected_tree = as_nbt_types(tree)
+    expected = writer.dumps(expected_tree)
+    back_tree = NBTReader().loads(NBTWriter().dumps(tree))
+    back = writer.dumps(back_tree)
+    if back != expected:
+        report(name, expected, back)
+        return False
+    pretty = back_tree.pretty_str()
+    if pretty != expected_tree.pretty_str():
+        report(name, expected_tree.pretty_str(), pretty)
+        return False
+    # and once more from the text read back: the NBT form is stable too
+    again = writer.dumps(NBTReader().loads(NBTWriter().dumps(parser.parse(back))))
+    if again != expected:
+        report(name, expected, again)
+        return False
+    return True
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="NBT round-trip check")
+    arg_parser.add_argument("--chapters", type=int, default=10)
+    arg_parser.add_argument("--quests", type=int, default=10)
+    arg_parser.add_argument("--floats", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    try:
+        check_values()
+    except AssertionError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    print("[INFO] edge values of every tag type round-trip")
+
+    documents: list[tuple[str, str]] = [
+        ("edges", EDGE_DOCUMENT),
+        ("floats", float_document(args.floats, args.seed)),
+    ]
+    with tempfile.TemporaryDirectory() as pack_dir:
+        PackGenerator(args.chapters, args.quests, 8, 0.1, 1, args.seed).write(
+            pack_dir
+        )
+        quests_dir = os.path.join(pack_dir, "quests")
+        for dir_path, _, file_names in sorted(os.walk(quests_dir)):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                with open(file_path, "r", encoding="utf-8") as f:
+                    documents.append(
+                        (os.path.relpath(file_path, quests_dir), f.read())
+                    )
+
+    for lexer, engine in (("ply", "yacc"), ("scanner", "descent")):
+        parser = SNBTParser(lexer=lexer, engine=engine)
+        for name, text in documents:
+            if not check(name, text, parser):
+                sys.exit(1)
+        print(f"[INFO] {lexer}+{engine}: {len(documents)} documents round-trip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# Synthetic FTBQuests pack generator shared by the benchmarks.
+#
+#   python -m benchmarks.pack OUT_DIR [--chapters 40] [--quests 40] [--lines 8]
+#                                     [--rich 0.1] [--langs 2] [--seed 1]
+#
+# Writes OUT_DIR/quests/{data,chapter_groups}.snbt, chapters/ and
+# reward_tables/ in the layout FTBQuests uses, plus OUT_DIR/lang/<lang>.json
+# holding the texts of the localization keys referenced from the quests.
+# The same arguments always produce the same files.
+from argparse import ArgumentParser
+import json
+import os
+import random
+
+LANG_CODES = (
+    "zh_cn",
+    "en_us",
+    "ja_jp",
+    "ko_kr",
+    "ru_ru",
+    "de_de",
+    "fr_fr",
+    "es_es",
+    "pt_br",
+    "zh_tw",
+)
+
+WORDS = (
+    "iron gold copper steel gear shaft engine rocket quest reward collect "
+    "build craft the a of &a&l &r 机械 动力 火箭 世界 ! , ."
+).split()
+
+
+def snbt_str(text: str) -> str:
+    escaped = (
+        text.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\t", "\\t")
+        .replace("\r", "\\r")
+    )
+    return f'"{escaped}"'
+
+
+class PackGenerator:
+    def __init__(
+        self,
+        chapters: int = 40,
+        quests: int = 40,
+        lines: int = 8,
+        rich_ratio: float = 0.1,
+        langs: int = 2,
+        seed: int = 1,
+    ) -> None:
+        if not 1 <= langs <= len(LANG_CODES):
+            raise ValueError(f"langs must be between 1 and {len(LANG_CODES)}")
+        self.chapters = chapters
+        self.quests = quests
+        self.lines = lines
+        # share of description lines that are JSON text components
+        self.rich_ratio = rich_ratio
+        # the first one is the quest language
+        self.langs = LANG_CODES[:langs]
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lang: dict[str, str] = dict()
+
+    def hex_id(self) -> str:
+        return "%016X" % self.random.getrandbits(64)
+
+    def sentence(self, max_words: int = 10) -> str:
+        return " ".join(
+            self.random.choice(WORDS)
+            for _ in range(self.random.randint(2, max_words))
+        )
+
+    def description_line(self, key: str) -> str:
+        if self.random.random() < self.rich_ratio:
+            # rich text line, a JSON text component
+            if self.random.random() < 0.5:
+                component = {"text": self.sentence(), "color": "gold"}
+            else:
+                component = [
+                    "",
+                    self.sentence(),
+                    {
+                        "text": self.sentence(3),
+                        "underlined": "true",
+                        "clickEvent": {
+                            "action": "change_page",
+                            "value": self.hex_id(),
+                        },
+                    },
+                ]
+            return snbt_str(json.dumps(component, ensure_ascii=False))
+        kind = self.random.random()
+        if kind < 0.1:
+            return snbt_str("")
+        if kind < 0.12:
+            return snbt_str("{@pagebreak}")
+        if kind < 0.17:
+            self.lang[key] = self.sentence()
+            return snbt_str("{" + key + "}")
+        return snbt_str(self.sentence(14))
+
+    def quest(self, chapter: int, index: int, indent: str) -> list[str]:
+        r = self.random
+        description = [
+            indent + "\t\t" + self.description_line(f"pack.q{chapter}_{index}_{i}")
+            for i in range(self.lines)
+        ]
+        return [
+            indent + "{",
+            indent + f'\tdependencies: ["{self.hex_id()}"]',
+            indent + "\tdescription: [",
+            *description,
+            indent + "\t]",
+            indent + f'\tid: "{self.hex_id()}"',
+            indent + "\trewards: [{",
+            indent + f'\t\tid: "{self.hex_id()}"',
+            indent + '\t\ttype: "xp"',
+            indent + f"\t\txp: {r.randint(1, 100)}",
+            indent + "\t}]",
+            indent + "\tsize: 1.5d",
+            indent + f"\tsubtitle: {snbt_str(self.sentence(4))}",
+            indent + "\ttasks: [{",
+            indent + "\t\tcount: 64L",
+            indent + f'\t\tid: "{self.hex_id()}"',
+            indent + '\t\titem: { Count: 1b, id: "minecraft:stone" }',
+            indent + '\t\ttype: "item"',
+            indent + "\t}]",
+            indent + f"\ttitle: {snbt_str(self.sentence(4))}",
+            indent + f"\tx: {r.randint(-20, 20) / 2}d",
+            indent + f"\ty: {r.randint(-20, 20) / 2}d",
+            indent + "}",
+        ]
+
+    def chapter(self, index: int, group: str) -> str:
+        lines = [
+            "{",
+            "\tdefault_hide_dependency_lines: false",
+            f'\tfilename: "chapter_{index:03d}"',
+            f'\tgroup: "{group}"',
+            '\ticon: "minecraft:oak_log"',
+            f'\tid: "{self.hex_id()}"',
+            f"\torder_index: {index}",
+            "\tquest_links: [ ]",
+            "\tquests: [",
+        ]
+        for quest in range(self.quests):
+            lines.extend(self.quest(index, quest, "\t\t"))
+        lines.extend(
+            [
+                "\t]",
+                f"\tsubtitle: [{snbt_str(self.sentence(3))}]",
+                f"\ttitle: {snbt_str(self.sentence(3))}",
+                "}",
+            ]
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir: str) -> None:
+        quests_dir = os.path.join(out_dir, "quests")
+        lang_dir = os.path.join(out_dir, "lang")
+        for dir_name in ("chapters", "reward_tables"):
+            os.makedirs(os.path.join(quests_dir, dir_name), exist_ok=True)
+        os.makedirs(lang_dir, exist_ok=True)
+
+        self.random = random.Random(self.seed)
+        self.lang = dict()
+        with open(os.path.join(quests_dir, "data.snbt"), "w", encoding="utf-8") as f:
+            f.write(
+                '{\n\tdisable_gui: false\n\tfile_version: 13\n\tgrid_scale: 0.5d\n'
+                f'\ttitle: {snbt_str(self.sentence(3))}\n\tversion: 13\n}}\n'
+            )
+
+        groups = [self.hex_id() for _ in range(3)]
+        with open(
+            os.path.join(quests_dir, "chapter_groups.snbt"), "w", encoding="utf-8"
+        ) as f:
+            f.write("{\n\tchapter_groups: [\n")
+            for group in groups:
+                f.write(
+                    f'\t\t{{ id: "{group}", title: {snbt_str(self.sentence(3))} }}\n'
+                )
+            f.write("\t]\n}\n")
+
+        for table in range(3):
+            with open(
+                os.path.join(quests_dir, "reward_tables", f"table_{table}.snbt"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(
+                    f'{{\n\tid: "{self.hex_id()}"\n\tloot_size: 1\n\trewards: [\n'
+                    '\t\t{ item: { Count: 1b, id: "minecraft:diamond" } }\n'
+                    '\t\t{ count: 4, item: { Count: 1b, id: "minecraft:iron_ingot" }, weight: 2.5f }\n'
+                    f"\t]\n\ttitle: {snbt_str(self.sentence(3))}\n\tuse_title: true\n}}\n"
+                )
+
+        for chapter in range(self.chapters):
+            with open(
+                os.path.join(quests_dir, "chapters", f"chapter_{chapter:03d}.snbt"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(self.chapter(chapter, self.random.choice(groups)))
+
+        # other languages translate about two thirds of the keys
+        lang_random = random.Random(self.seed)
+        for i, lang in enumerate(self.langs):
+            if i == 0:
+                entries = self.lang
+            else:
+                entries = {
+                    key: f"[{lang}] {value}"
+                    for key, value in self.lang.items()
+                    if lang_random.random() < 0.7
+                }
+            with open(
+                os.path.join(lang_dir, f"{lang}.json"), "w", encoding="utf-8"
+            ) as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Generate a synthetic FTBQuests pack")
+    arg_parser.add_argument("out_dir")
+    arg_parser.add_argument("--chapters", type=int, default=40)
+    arg_parser.add_argument("--quests", type=int, default=40)
+    arg_parser.add_argument("--lines", type=int, default=8)
+    arg_parser.add_argument("--rich", type=float, default=0.1)
+    arg_parser.add_argument("--langs", type=int, default=2)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+    PackGenerator(
+        args.chapters, args.quests, args.lines, args.rich, args.langs, args.seed
+    ).write(args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Cold start benchmark: runs every case in a fresh interpreter inside an empty
+# temporary working directory and reports the time on top of a bare `python`.
+#
+#   python -m benchmarks.startup [--runs 10] [--max-ms 60]
+#
+# Fails (exit code 1) when the startup-optimized path (scanner + descent)
+# loads ply, leaves files behind in the working directory, or takes longer
+# than --max-ms.
+from argparse import ArgumentParser
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "python": "pass",
+    "import": "import ftbquest_profiler",
+    "ply+yacc": (
+        "from ftbquest_profiler.snbt_parser import SNBTParser\n"
+        "SNBTParser(lexer='ply', engine='yacc')"
+    ),
+    "scanner+descent": (
+        "from ftbquest_profiler.snbt_parser import SNBTParser\n"
+        "SNBTParser(lexer='scanner', engine='descent')\n"
+        "import sys\n"
+        "assert not any(m == 'ply' or m.startswith('ply.') for m in sys.modules), 'ply was imported'"
+    ),
+    "profiler": (
+        "import os\n"
+        "from ftbquest_profiler import FTBQuestProfiler\n"
+        "os.makedirs('in')\n"
+        "FTBQuestProfiler('in', 'out', 'lang', logging=False, lexer='scanner', engine='descent')\n"
+        "import shutil\n"
+        "for d in ('in', 'out'): shutil.rmtree(d)"
+    ),
+}
+
+
+def run_case(code: str, runs: int) -> float:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    best = float("inf")
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=cwd,
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+            best = min(best, time.perf_counter() - start)
+            leftovers = os.listdir(cwd)
+            if leftovers:
+                raise AssertionError(
+                    f"files written to the working directory: {leftovers}"
+                )
+    return best * 1000
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="FTBQuestProfiler startup benchmark")
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--max-ms", type=float, default=50.0)
+    args = arg_parser.parse_args()
+
+    results = {name: run_case(code, args.runs) for name, code in CASES.items()}
+    base = results["python"]
+    for name, ms in results.items():
+        print(f"{name:>16}: {ms:7.1f} ms (+{ms - base:.1f} ms)")
+
+    overhead = results["scanner+descent"] - base
+    if overhead > args.max_ms:
+        print(
+            f"[ERROR] scanner+descent startup overhead {overhead:.1f} ms exceeds {args.max_ms:.1f} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
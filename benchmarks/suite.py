@@ -0,0 +1,389 @@
+# Benchmark suite over a generated pack (see benchmarks/pack.py).
+#
+#   python -m benchmarks.suite [--chapters 40] [--quests 40] [--lines 8]
+#                              [--rich 0.1] [--langs 2] [--seed 1]
+#                              [--repeat 3] [--only lexer,parse,...]
+#                              [--out benchmark.json] [--compare OLD.json]
+#
+# Every timing is the best of --repeat runs. Results, together with the pack
+# parameters and the environment, are written to --out as JSON; --compare
+# prints the change of every rate against an earlier results file.
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+
+from ftbquest_profiler import FTBQuestProfiler
+from ftbquest_profiler.lang_forest import LangTree, LangWriter
+from ftbquest_profiler.snbt import NBTReader, NBTWriter, SNBTWriter
+from ftbquest_profiler.snbt_parser import SNBTLexer, SNBTParser, SNBTScanner
+from .pack import PackGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = (
+    "lexer",
+    "parse",
+    "pretty",
+    "nbt",
+    "lang_tree",
+    "lang_file",
+    "profile",
+)
+
+MB = 1024 * 1024
+
+
+class Suite:
+    def __init__(
+        self, pack_dir: str, generator: PackGenerator, repeat: int
+    ) -> None:
+        self.pack_dir = pack_dir
+        self.generator = generator
+        self.repeat = repeat
+        self.quests_dir = os.path.join(pack_dir, "quests")
+        self.files = sorted(
+            os.path.join(dir_path, file_name)
+            for dir_path, _, file_names in os.walk(self.quests_dir)
+            for file_name in file_names
+            if file_name.endswith(".snbt")
+        )
+        self.size = sum(os.path.getsize(file_path) for file_path in self.files)
+
+    def best(self, run) -> float:
+        best = float("inf")
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def bench_lexer(self) -> dict:
+        results = dict()
+        for name, lexer_class in (("ply", SNBTLexer), ("scanner", SNBTScanner)):
+            lexer = lexer_class()
+            count = 0
+
+            def run() -> None:
+                nonlocal count
+                count = 0
+                for file_path in self.files:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        lexer.input_file(f)
+                        for _ in iter(lexer.token, None):
+                            count += 1
+
+            seconds = self.best(run)
+            results[name] = {
+                "seconds": seconds,
+                "tokens": count,
+                "tokens_per_s": count / seconds,
+            }
+        return results
+
+    def bench_parse(self) -> dict:
+        results = dict()
+        for lexer, engine in (
+            ("ply", "yacc"),
+            ("scanner", "yacc"),
+            ("scanner", "descent"),
+        ):
+            parser = SNBTParser(lexer=lexer, engine=engine)
+
+            def run() -> None:
+                for file_path in self.files:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        parser.parse_file(f)
+
+            seconds = self.best(run)
+            results[f"{lexer}+{engine}"] = {
+                "seconds": seconds,
+                "mb_per_s": self.size / MB / seconds,
+            }
+        return results
+
+    def bench_pretty(self) -> dict:
+        parser = SNBTParser(lexer="scanner", engine="descent")
+        trees = []
+        for file_path in self.files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                trees.append(parser.parse_file(f))
+        size = sum(len(tree.pretty_str().encode("utf-8")) for tree in trees)
+        writer = SNBTWriter()
+
+        results = dict()
+        with tempfile.TemporaryDirectory() as out_dir:
+            out_path = os.path.join(out_dir, "out.snbt")
+            for name, dump in (
+                ("pretty_file", lambda tree, f: tree.pretty_file(f)),
+                ("writer", writer.dump),
+            ):
+
+                def run() -> None:
+                    for tree in trees:
+                        with open(out_path, "w", encoding="utf-8") as f:
+                            dump(tree, f)
+
+                seconds = self.best(run)
+                results[name] = {
+                    "seconds": seconds,
+                    "mb_per_s": size / MB / seconds,
+                }
+        return results
+
+    def bench_nbt(self) -> dict:
+        # binary NBT of the same trees, against the text of their files
+        parser = SNBTParser(lexer="scanner", engine="descent")
+        trees = []
+        for file_path in self.files:
+            with open(file_path, "r", encoding="utf-8") as f:
+                trees.append(parser.parse_file(f))
+        writer = NBTWriter()
+        reader = NBTReader()
+        blobs = [writer.dumps(tree) for tree in trees]
+        size = sum(len(blob) for blob in blobs)
+
+        results = dict()
+        for name, run in (
+            ("write", lambda: [writer.dumps(tree) for tree in trees]),
+            ("read", lambda: [reader.loads(blob) for blob in blobs]),
+        ):
+            seconds = self.best(run)
+            results[name] = {
+                "seconds": seconds,
+                "bytes": size,
+                "mb_per_s": size / MB / seconds,
+            }
+        with tempfile.TemporaryDirectory() as out_dir:
+            out_path = os.path.join(out_dir, "out.nbt")
+
+            def write_gzip() -> None:
+                for tree in trees:
+                    writer.write_file(tree, out_path)
+
+            seconds = self.best(write_gzip)
+            results["write_gzip"] = {
+                "seconds": seconds,
+                "mb_per_s": size / MB / seconds,
+            }
+        return results
+
+    def lang_entries(self) -> list[tuple[str, str]]:
+        # keys shaped like the ones the profiler generates
+        rand = random.Random(self.generator.seed)
+        entries = []
+        for chapter in range(self.generator.chapters):
+            for _ in range(self.generator.quests):
+                quest = "quest_%016X" % rand.getrandbits(64)
+                prefix = f"chapter_chapter_{chapter:03d}.{quest}"
+                entries.append((f"{prefix}.title", "title"))
+                entries.append((f"{prefix}.subtitle", "subtitle"))
+                for line in range(1, self.generator.lines + 1):
+                    entries.append((f"{prefix}.desc_{line:02d}", "text"))
+        return entries
+
+    def bench_lang_tree(self) -> dict:
+        entries = self.lang_entries()
+        tree = LangTree("zh_cn")
+
+        def insert() -> None:
+            nonlocal tree
+            tree = LangTree("zh_cn")
+            for key, value in entries:
+                tree.insert(key, value)
+
+        def insert_many() -> None:
+            nonlocal tree
+            tree = LangTree("zh_cn")
+            tree.insert_many(entries)
+
+        results = dict()
+        for name, run in (("insert", insert), ("insert_many", insert_many)):
+            seconds = self.best(run)
+            results[name] = {
+                "seconds": seconds,
+                "keys": len(entries),
+                "keys_per_s": len(entries) / seconds,
+            }
+        for name, sort in (("walk_sorted", True), ("walk", False)):
+            seconds = self.best(
+                lambda: sum(1 for _ in tree.root.walk(sort=sort))
+            )
+            results[name] = {
+                "seconds": seconds,
+                "keys": len(entries),
+                "keys_per_s": len(entries) / seconds,
+            }
+        return results
+
+    def bench_lang_file(self) -> dict:
+        entries = [
+            (key, f'&a{value} "{key}" 机械动力') for key, value in self.lang_entries()
+        ]
+        lang = dict(entries)
+        results = dict()
+        with tempfile.TemporaryDirectory() as out_dir:
+            out_path = os.path.join(out_dir, "zh_cn.json")
+
+            def json_dump(sort: bool) -> None:
+                with open(out_path, "w", encoding="utf-8") as f:
+                    json.dump(lang, f, ensure_ascii=False, indent=2, sort_keys=sort)
+
+            for sort in (False, True):
+                writer = LangWriter(sort=sort)
+                suffix = "_sorted" if sort else ""
+                for name, run in (
+                    (f"json_dump{suffix}", lambda: json_dump(sort)),
+                    (f"writer{suffix}", lambda: writer.write(out_path, entries)),
+                ):
+                    seconds = self.best(run)
+                    results[name] = {
+                        "seconds": seconds,
+                        "keys": len(entries),
+                        "keys_per_s": len(entries) / seconds,
+                    }
+        return results
+
+    def bench_profile(self) -> dict:
+        cases = [
+            ("ply+yacc", "ply", "yacc", 1),
+            ("scanner+descent", "scanner", "descent", 1),
+        ]
+        cpu_count = os.cpu_count() or 1
+        if cpu_count > 1:
+            cases.append(
+                (f"scanner+descent jobs={cpu_count}", "scanner", "descent", cpu_count)
+            )
+
+        results = dict()
+        for name, lexer, engine, jobs in cases:
+
+            def run() -> None:
+                with tempfile.TemporaryDirectory() as out_dir:
+                    FTBQuestProfiler(
+                        in_ftbq_dir=self.quests_dir,
+                        out_ftbq_dir=os.path.join(out_dir, "quests"),
+                        out_lang_dir=os.path.join(out_dir, "lang"),
+                        in_lang_dir=os.path.join(self.pack_dir, "lang"),
+                        default_lang=self.generator.langs[0],
+                        sort_lang=True,
+                        logging=False,
+                        lexer=lexer,
+                        engine=engine,
+                        jobs=jobs,
+                    ).profile()
+
+            seconds = self.best(run)
+            results[name] = {
+                "seconds": seconds,
+                "mb_per_s": self.size / MB / seconds,
+            }
+        return results
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def rates(results: dict) -> dict[str, float]:
+    # flattens {"parse": {"ply+yacc": {"mb_per_s": 1.0}}} for --compare
+    flat = dict()
+    for benchmark, cases in results.items():
+        for case, values in cases.items():
+            for metric, value in values.items():
+                if metric.endswith("_per_s"):
+                    flat[f"{benchmark}/{case}/{metric}"] = value
+    return flat
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="FTBQuestProfiler benchmark suite")
+    arg_parser.add_argument("--chapters", type=int, default=40)
+    arg_parser.add_argument("--quests", type=int, default=40)
+    arg_parser.add_argument("--lines", type=int, default=8)
+    arg_parser.add_argument("--rich", type=float, default=0.1)
+    arg_parser.add_argument("--langs", type=int, default=2)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--only", default=",".join(BENCHMARKS))
+    arg_parser.add_argument("--out", default="benchmark.json")
+    arg_parser.add_argument("--compare")
+    args = arg_parser.parse_args()
+
+    names = [name for name in args.only.split(",") if name]
+    for name in names:
+        if name not in BENCHMARKS:
+            arg_parser.error(
+                f"unknown benchmark '{name}', expected one of {', '.join(BENCHMARKS)}"
+            )
+
+    generator = PackGenerator(
+        args.chapters, args.quests, args.lines, args.rich, args.langs, args.seed
+    )
+    results = dict()
+    with tempfile.TemporaryDirectory() as pack_dir:
+        generator.write(pack_dir)
+        suite = Suite(pack_dir, generator, args.repeat)
+        print(
+            f"pack: {len(suite.files)} files, {suite.size / MB:.2f} MB, "
+            f"{len(generator.langs)} langs"
+        )
+        for name in names:
+            results[name] = getattr(suite, f"bench_{name}")()
+            for case, values in results[name].items():
+                summary = ", ".join(
+                    f"{metric} {value:,.2f}"
+                    for metric, value in values.items()
+                    if metric.endswith("_per_s") or metric == "seconds"
+                )
+                print(f"{name:>10} {case:>28}: {summary}")
+        pack = {
+            "chapters": args.chapters,
+            "quests": args.quests,
+            "lines": args.lines,
+            "rich_ratio": args.rich,
+            "langs": args.langs,
+            "seed": args.seed,
+            "files": len(suite.files),
+            "bytes": suite.size,
+        }
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "pack": pack,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = rates(json.load(f).get("results", dict()))
+        for key, value in rates(results).items():
+            if old.get(key):
+                print(f"{key:>52}: {value / old[key]:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
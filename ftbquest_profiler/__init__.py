@@ -1,3 +1,15 @@
-from .ftbquest_profiler import FTBQuestProfiler
+# the profilers are imported on first access, so that importing only the
+# parser (ftbquest_profiler.snbt_parser) does not load them
+__all__ = ["FTBQuestProfiler", "BatchProfiler"]
 
-__all__ = ["FTBQuestProfiler"]
+
+def __getattr__(name: str):
+    if name == "FTBQuestProfiler":
+        from .ftbquest_profiler import FTBQuestProfiler
+
+        return FTBQuestProfiler
+    if name == "BatchProfiler":
+        from .batch import BatchProfiler
+
+        return BatchProfiler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,164 @@
+# profiles several FTBQuests directories (packs) in one process, or in a
+# few worker processes each taking one pack after another
+#
+# the packs a process profiles share its warmed SNBTParser and rich text
+# cache (see SharedState); packs with the same parse cache directory share
+# that on disk as well, e.g. variants of one modpack holding the same
+# chapter files
+from contextlib import redirect_stdout
+from io import StringIO
+import os
+import sys
+import time
+from .ftbquest_profiler import FTBQuestProfiler
+from .rich_text import RichTextCache
+from .snbt_parser import SNBTParser
+
+MODES = ("profile", "bake")
+
+
+# the parsers and rich text caches of the packs profiled so far in this
+# process, handed on to the next pack with the same settings; attached
+# before the profiler builds its own, which it does only on first use
+class SharedState:
+    def __init__(self) -> None:
+        self.parsers: dict[tuple, SNBTParser] = dict()
+        self.rich_texts: dict[int, RichTextCache] = dict()
+
+    def attach(self, profiler: FTBQuestProfiler) -> None:
+        cache = profiler.parse_cache
+        key = (
+            profiler.snbt_lexer,
+            profiler.snbt_engine,
+            cache.cache_dir if cache is not None else "",
+            cache.max_bytes if cache is not None else 0,
+        )
+        parser = self.parsers.get(key)
+        if parser is None:
+            parser = self.parsers[key] = profiler.get_parser()
+        profiler.parser = parser
+        profiler.parse_cache = parser.cache
+        rich_text = self.rich_texts.get(profiler.rich_text_cache)
+        if rich_text is None:
+            rich_text = self.rich_texts[profiler.rich_text_cache] = (
+                profiler.get_rich_text()
+            )
+        profiler.rich_text = rich_text
+
+
+shared = SharedState()
+
+
+def run_pack(name: str, kwargs: dict, mode: str, bake_language: str) -> dict:
+    # profiles (or bakes) one pack with the shared state of this process,
+    # returns its timings and whether it succeeded
+    clock = time.perf_counter()
+    cpu = time.process_time()
+    result: dict = {"ok": True}
+    try:
+        profiler = FTBQuestProfiler(**kwargs)
+        shared.attach(profiler)
+        if mode == "bake":
+            profiler.bake(bake_language)
+        else:
+            profiler.profile()
+    except Exception as e:
+        if kwargs.get("logging", True):
+            print("[ERROR]", f"Pack '{name}' failed: {e}")
+        result = {"ok": False, "error": str(e)}
+    result["wall_s"] = time.perf_counter() - clock
+    result["cpu_s"] = time.process_time() - cpu
+    return result
+
+
+def run_pack_captured(
+    name: str, kwargs: dict, mode: str, bake_language: str
+) -> tuple[dict, str]:
+    # in a worker process: log messages are printed by the parent, one
+    # pack at a time
+    with redirect_stdout(StringIO()) as output:
+        result = run_pack(name, kwargs, mode, bake_language)
+    return result, output.getvalue()
+
+
+# packs maps each pack's name to its FTBQuestProfiler arguments; with
+# jobs > 1 up to that many packs are profiled at the same time, in worker
+# processes, and the log of each is printed once it is done
+class BatchProfiler:
+    def __init__(
+        self,
+        packs: dict[str, dict],
+        jobs: int = 1,
+        mode: str = "profile",
+        bake_language: str = "",
+        logging: bool = True,
+    ) -> None:
+        self.logging = logging
+        if not packs:
+            raise ValueError("No packs to profile.")
+        self.packs = packs
+        if jobs < 0:
+            raise ValueError("Number of jobs cannot be negative.")
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        self.jobs = min(jobs, len(packs))
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'.")
+        self.mode = mode
+        self.bake_language = bake_language
+        self.log(f"Batch: {len(packs)} packs, {self.jobs} at a time")
+
+    def log(self, message: str) -> None:
+        if self.logging:
+            print("[INFO]", message)
+
+    def error(self, message: str) -> None:
+        if self.logging:
+            print("[ERROR]", message)
+
+    def run(self) -> dict[str, dict]:
+        # the result of every pack, see run_pack, in the order of packs
+        clock = time.perf_counter()
+        results: dict[str, dict] = dict()
+        if self.jobs <= 1:
+            for name, kwargs in self.packs.items():
+                self.log(f"Pack '{name}':")
+                results[name] = run_pack(
+                    name, kwargs, self.mode, self.bake_language
+                )
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                futures = {
+                    pool.submit(
+                        run_pack_captured,
+                        name,
+                        kwargs,
+                        self.mode,
+                        self.bake_language,
+                    ): name
+                    for name, kwargs in self.packs.items()
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    results[name], output = future.result()
+                    self.log(f"Pack '{name}':")
+                    sys.stdout.write(output)
+        results = {name: results[name] for name in self.packs}
+        self.log_summary(results, time.perf_counter() - clock)
+        failed = [name for name, result in results.items() if not result["ok"]]
+        if failed:
+            raise RuntimeError(
+                f"{len(failed)} of {len(results)} packs failed: {', '.join(failed)}."
+            )
+        return results
+
+    def log_summary(self, results: dict[str, dict], wall: float) -> None:
+        self.log(f"Batch completed in {wall:.2f}s:")
+        for name, result in results.items():
+            timing = f"{result['wall_s']:.2f}s (cpu {result['cpu_s']:.2f}s)"
+            if result["ok"]:
+                self.log(f"  {name}: {timing}")
+            else:
+                self.error(f"  {name}: failed after {timing}: {result['error']}")
@@ -0,0 +1,78 @@
+from contextlib import suppress
+import os
+import threading
+
+WRITE_MODES = ("always", "changed", "dry_run")
+
+
+# writes the profiler's output files
+#
+# "always" truncates and rewrites every file; "changed" renders to memory,
+# compares with the file on disk (size, then bytes) and replaces it through
+# a temporary file and os.replace only when they differ, so unchanged files
+# keep their mtime and a reader never sees a half-written file; "dry_run"
+# compares the same way but writes nothing
+#
+# may be used from several threads, e.g. by LangWriter.write_many
+class FileOutput:
+    def __init__(self, mode: str = "always") -> None:
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode '{mode}'.")
+        self.mode = mode
+        self.lock = threading.Lock()
+        # paths compared this run, in "changed" and "dry_run" mode
+        self.changed: list[str] = []
+        self.unchanged: list[str] = []
+
+    def reset(self) -> None:
+        self.changed = []
+        self.unchanged = []
+
+    def write_text(
+        self, file_path: str, text: str, newline: str | None = None
+    ) -> int:
+        # newline as for open(); returns the number of bytes written, or
+        # that would be written in a dry run, 0 for an unchanged file
+        if self.mode == "always":
+            with open(file_path, "w", encoding="utf-8", newline=newline) as f:
+                f.write(text)
+            return os.path.getsize(file_path)
+
+        if newline is None and os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        data = text.encode("utf-8")
+        if self.same_content(file_path, data):
+            with self.lock:
+                self.unchanged.append(file_path)
+            return 0
+        with self.lock:
+            self.changed.append(file_path)
+        if self.mode != "dry_run":
+            self.replace(file_path, data)
+        return len(data)
+
+    def same_content(self, file_path: str, data: bytes) -> bool:
+        try:
+            if os.path.getsize(file_path) != len(data):
+                return False
+            with open(file_path, "rb") as f:
+                return f.read() == data
+        except OSError:
+            return False
+
+    def replace(self, file_path: str, data: bytes) -> None:
+        # the temporary file sits next to the target, os.replace is atomic
+        # only within one file system
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            if os.path.exists(file_path):
+                import shutil
+
+                shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temp_path)
+            raise
@@ -1,8 +1,31 @@
-from .snbt_parser import SNBTParser
-from .snbt import SNBT, SNBTList
+from __future__ import annotations
+from .snbt_parser import SNBTParser, ParseCache
+from .snbt import SNBT, SNBTList, SNBTWriter
 from .snbt.basic_type import *
+from .lang_forest import LangStore, LangWriter
+from . import profiler_pool
+from .manifest import Manifest, file_hash
+from .run_report import RunReport, FileTimer
+from .file_output import FileOutput, WRITE_MODES
+from .rich_text import RichTextCache, PAGEBREAK, IMAGE, KEY, PLAIN, JSON
+from .selection import Selection
+from collections import deque
+from contextlib import nullcontext
+from functools import cache
+from io import StringIO
+from itertools import islice, repeat
+from typing import TYPE_CHECKING
 import os
+import re
+import sys
 import json
+import time
+
+# asyncio, concurrent.futures and hashlib are imported where they are used,
+# the first two alone would double the import time of the package
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 
 class FTBQuestProfiler:
@@ -17,9 +40,33 @@ class FTBQuestProfiler:
         sort_lang: bool = False,
         logging: bool = True,
         merge_raw_text: bool = True,
+        lexer: str = "ply",
+        engine: str = "yacc",
+        jobs: int = 1,
+        incremental: bool = False,
+        output_format: str = "pretty",
+        report: bool = False,
+        cprofile: bool = False,
+        lang_layout: str = "single",
+        write_mode: str = "always",
+        rich_text_cache: int = 4096,
+        dedup: str = "off",
+        parse_cache_dir: str = "",
+        parse_cache_size: int = 256,
+        include: str = "",
+        exclude: str = "",
     ) -> None:
         self.logging = logging
 
+        # checked first, a dry run does not even create the output directories
+        if not write_mode:
+            write_mode = "always"
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode '{write_mode}'.")
+        self.write_mode = write_mode
+        self.output = FileOutput(write_mode)
+        self.dry_run = write_mode == "dry_run"
+
         if not in_ftbq_dir:
             raise ValueError("Input FTBQuests directory is required.")
         if not os.path.exists(in_ftbq_dir):
@@ -31,7 +78,7 @@ class FTBQuestProfiler:
 
         if not out_ftbq_dir:
             raise ValueError("Output FTBQuests directory is required.")
-        if not os.path.exists(out_ftbq_dir):
+        if not os.path.exists(out_ftbq_dir) and not self.dry_run:
             os.makedirs(out_ftbq_dir)
         self.out_ftbq_dir = os.path.abspath(out_ftbq_dir)
         self.log(f"Output FTBQuests directory: {self.out_ftbq_dir}")
@@ -56,8 +103,7 @@ class FTBQuestProfiler:
 
         if not out_lang_dir:
             raise ValueError("Output language directory is required.")
-        if not os.path.exists(out_lang_dir):
-            os.makedirs(out_lang_dir)
+        # made when lang files are saved, baking writes none
         self.out_lang_dir = os.path.abspath(out_lang_dir)
         self.log(f"Output language directory: {self.out_lang_dir}")
 
@@ -70,12 +116,151 @@ class FTBQuestProfiler:
             self.log(f"Output localization key prefix: {out_namespace}")
         self.out_namespace = out_namespace
 
-        self.parser = SNBTParser()
+        if not lang_layout:
+            lang_layout = "single"
+        if lang_layout not in ("single", "sharded"):
+            raise ValueError(f"Unknown lang layout '{lang_layout}'.")
+        self.log(f"Lang layout: {lang_layout}")
+        self.lang_layout = lang_layout
+
+        # comma-separated, see Selection
+        include_patterns = [p.strip() for p in include.split(",") if p.strip()]
+        exclude_patterns = [p.strip() for p in exclude.split(",") if p.strip()]
+        self.selection: Selection | None = None
+        if include_patterns or exclude_patterns:
+            self.selection = Selection(include_patterns, exclude_patterns)
+            if include_patterns:
+                self.log(f"Include: {', '.join(include_patterns)}")
+            if exclude_patterns:
+                self.log(f"Exclude: {', '.join(exclude_patterns)}")
+        # input files selected this run, relative to the FTBQuests directory
+        self.selected: set[str] = set()
+
+        if not dedup:
+            dedup = "off"
+        if dedup not in ("off", "report", "shared"):
+            raise ValueError(f"Unknown lang dedup mode '{dedup}'.")
+        if dedup == "shared" and self.selection is not None:
+            # shared keys depend on the texts of every file
+            self.warn(
+                "Shared lang keys need every file to be processed. Using 'report'."
+            )
+            dedup = "report"
+        self.log(f"Lang dedup: {dedup}")
+        self.dedup = dedup
+        # outputs held back until shared keys are known, in "shared" mode
+        self.deferred: list[tuple[str, str, dict | None]] | None = None
+
+        if not output_format:
+            output_format = "pretty"
+        if output_format not in ("pretty", "compact", "patch"):
+            raise ValueError(f"Unknown output format '{output_format}'.")
+        self.log(f"Output format: {output_format}")
+        self.output_format = output_format
+        self.writer = SNBTWriter(compact=output_format == "compact")
+        self.log(f"Write mode: {write_mode}")
+
+        if not lexer:
+            lexer = "ply"
+        if not engine:
+            engine = "yacc"
+        if output_format == "patch" and (
+            lexer != "scanner" or engine != "descent"
+        ):
+            # only these record where each value sits in the source text
+            self.warn(
+                "Patch output needs the 'scanner' lexer and the 'descent' engine. Using them."
+            )
+            lexer, engine = "scanner", "descent"
+        # checked here, the parser itself is built on first use
+        if lexer not in SNBTParser.lexers:
+            raise ValueError(
+                f"Unknown SNBT lexer '{lexer}', expected one of {', '.join(SNBTParser.lexers)}"
+            )
+        if engine not in SNBTParser.engines:
+            raise ValueError(
+                f"Unknown SNBT parser engine '{engine}', expected one of {', '.join(SNBTParser.engines)}"
+            )
+        self.log(f"SNBT lexer: {lexer}")
+        self.log(f"SNBT parser engine: {engine}")
+        self.snbt_lexer = lexer
+        self.snbt_engine = engine
+        if parse_cache_size <= 0:
+            raise ValueError("Parse cache size must be positive.")
+        self.parse_cache: ParseCache | None = None
+        if parse_cache_dir:
+            self.parse_cache = ParseCache(
+                parse_cache_dir, parse_cache_size * 1024 * 1024
+            )
+            self.log(
+                f"Parse cache: {self.parse_cache.cache_dir} ({parse_cache_size} MB)"
+            )
+        # the parser and the rich text cache are built on first use (see
+        # get_parser and get_rich_text), or handed in beforehand, e.g. the
+        # ones BatchProfiler shares between packs
+        self.parser: SNBTParser | None = None
         self.sort_lang = sort_lang
         self.merge_raw_text = merge_raw_text
 
+        if rich_text_cache < 0:
+            raise ValueError("Rich text cache size cannot be negative.")
+        self.log(f"Rich text cache: {rich_text_cache} lines")
+        self.rich_text_cache = rich_text_cache
+        self.rich_text: RichTextCache | None = None
+
+        if jobs < 0:
+            raise ValueError("Number of jobs cannot be negative.")
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        self.log(f"Jobs: {jobs}")
+        self.jobs = jobs
+        self.pool: ProcessPoolExecutor | None = None
+
+        self.incremental = incremental
+        if incremental:
+            self.log("Incremental mode: enabled")
+        self.manifest: Manifest | None = None
+        self.input_hashes: dict[str, str] = dict()
+        self.saved_langs: LangStore | None = None
+
+        self.report = report or cprofile
+        self.cprofile = cprofile
+        if self.report:
+            self.log(f"Run report: {self.report_path()}")
+        self.run_report: RunReport | None = None
+        self.strings_replaced = 0
+        # key -> text of the language bake() puts back into the quests
+        self.baked_lang_code = ""
+        self.baked_lang: dict[str, str] = dict()
+
         self.log("FTBQuestProfiler initialized successfully.")
 
+    def __getstate__(self) -> dict:
+        # shipped once to every pool worker, see profiler_pool
+        state = self.__dict__.copy()
+        for key in (
+            "parser",
+            "pool",
+            "out_langs",
+            "manifest",
+            "saved_langs",
+            "run_report",
+            "output",
+            "rich_text",
+        ):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.parser = None
+        self.pool = None
+        self.manifest = None
+        self.saved_langs = None
+        self.run_report = None
+        self.output = FileOutput(self.write_mode)
+        self.rich_text = None
+
     def log(self, message: str) -> None:
         if self.logging:
             print("[INFO]", message)
@@ -89,42 +274,352 @@ class FTBQuestProfiler:
             print("[ERROR]", message)
 
     def profile(self) -> None:
-        self.get_langs()
-        self.out_langs: dict[str, dict[str, str]] = dict()
-        for lang_code in self.in_langs:
-            self.out_langs[lang_code] = dict()
-        self.do_data()
-        self.do_chapter_groups()
-        self.do_reward_tables()
-        self.do_chapters()
-        self.save_langs()
-        self.log("FTBQuests profiling completed.")
+        self.start_report()
+        try:
+            self.input_hashes = dict()
+            if self.incremental:
+                with self.stage("manifest"):
+                    self.manifest = self.load_manifest()
+                    up_to_date = self.is_up_to_date()
+                if up_to_date:
+                    self.log("Nothing changed since the last run.")
+                    self.log("FTBQuests profiling completed.")
+                    return
 
-    def get_langs(self):
-        langs: dict[str, dict[str, str]] = dict()
-        if self.in_lang_dir:
-            for file_name in os.listdir(self.in_lang_dir):
-                if not file_name.endswith(".json"):
-                    self.warn(
-                        f"Non-JSON file '{file_name}' found in lang/. Skipping."
+            with self.stage("get_langs"):
+                self.get_langs()
+            self.run_steps()
+            self.log("FTBQuests profiling completed.")
+        finally:
+            self.finish_report()
+
+    def start_steps(self) -> None:
+        self.out_langs = self.new_langs()
+        self.output.reset()
+        self.deferred = [] if self.dedup == "shared" else None
+        self.selected = set()
+
+    def run_steps(self) -> None:
+        self.start_steps()
+        try:
+            with self.stage("data"):
+                self.do_data()
+            with self.stage("chapter_groups"):
+                self.do_chapter_groups()
+            with self.stage("reward_tables"):
+                self.do_reward_tables()
+            with self.stage("chapters"):
+                self.do_chapters()
+        finally:
+            self.shutdown_pool()
+        self.finish_steps()
+
+    async def profile_async(
+        self, read_ahead: int = 4, write_behind: int = 4
+    ) -> None:
+        # same as profile(), but input files are read up to read_ahead files
+        # ahead and outputs written up to write_behind files behind, on
+        # threads, while the files are transformed one by one in order
+        if read_ahead < 1 or write_behind < 1:
+            raise ValueError("read_ahead and write_behind must be positive.")
+        self.start_report()
+        try:
+            self.input_hashes = dict()
+            if self.incremental:
+                with self.stage("manifest"):
+                    self.manifest = self.load_manifest()
+                    up_to_date = self.is_up_to_date()
+                if up_to_date:
+                    self.log("Nothing changed since the last run.")
+                    self.log("FTBQuests profiling completed.")
+                    return
+
+            with self.stage("get_langs"):
+                self.get_langs()
+            await self.run_steps_async(read_ahead, write_behind)
+            self.log("FTBQuests profiling completed.")
+        finally:
+            self.finish_report()
+
+    async def run_steps_async(self, read_ahead: int, write_behind: int) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.start_steps()
+        # the parser and out_langs are used by one thread only
+        transformer = ThreadPoolExecutor(max_workers=1)
+        try:
+            for step, step_files in (
+                ("data", self.data_files),
+                ("chapter_groups", self.chapter_groups_files),
+                ("reward_tables", self.reward_tables_files),
+                ("chapters", self.chapters_files),
+            ):
+                with self.stage(step):
+                    await self.process_files_async(
+                        *step_files(), transformer, read_ahead, write_behind
                     )
-                    continue
+        finally:
+            transformer.shutdown()
+            self.shutdown_pool()
+        self.finish_steps()
+
+    def finish_steps(self) -> None:
+        if self.selection is not None:
+            with self.stage("keep_langs"):
+                self.keep_unselected_langs()
+        if self.dedup != "off":
+            with self.stage("dedup"):
+                self.dedup_langs()
+        with self.stage("save_langs"):
+            self.save_langs()
+        if self.manifest is not None:
+            self.manifest.lang_codes = self.out_langs.lang_codes
+            if self.incremental and not self.dry_run:
+                with self.stage("manifest"):
+                    self.manifest.save(self.manifest_path())
+        self.log_written()
+
+    def log_written(self) -> None:
+        if self.write_mode == "changed":
+            self.log(
+                f"Wrote {len(self.output.changed)} changed files, "
+                f"{len(self.output.unchanged)} unchanged."
+            )
+        elif self.dry_run:
+            self.log(
+                f"Dry run: {len(self.output.changed)} files would change, "
+                f"{len(self.output.unchanged)} unchanged. Nothing was written."
+            )
 
-                lang_code = file_name[:-5]
-                file_path = os.path.join(self.in_lang_dir, file_name)
-                with open(file_path, "r", encoding="utf-8") as f:
-                    try:
-                        lang_data = json.load(f)
-                    except Exception as e:
-                        self.error(
-                            f"Failed to parse language file '{file_path}': {e}."
+    def report_path(self) -> str:
+        return os.path.join(self.out_ftbq_dir, ".profiler_report.json")
+
+    def start_report(self) -> None:
+        if not self.report:
+            return
+        self.run_report = RunReport(
+            {
+                "lexer": self.snbt_lexer,
+                "engine": self.snbt_engine,
+                "output_format": self.output_format,
+                "jobs": self.jobs,
+                "incremental": self.incremental,
+                "merge_raw_text": self.merge_raw_text,
+                "sort_lang": self.sort_lang,
+            },
+            cprofile=self.cprofile,
+        )
+
+    def finish_report(self) -> None:
+        if self.run_report is None:
+            return
+        if self.dry_run:
+            self.run_report = None
+            self.log("Dry run: run report not written.")
+            return
+        self.run_report.save(self.report_path())
+        self.run_report = None
+        self.log(f"Run report written to {self.report_path()}")
+
+    def stage(self, name: str):
+        if self.run_report is None:
+            return nullcontext()
+        return self.run_report.stage(name)
+
+    def watch(self, interval: float = 1.0, debounce: float = 0.5) -> None:
+        # keeps the parser, the input langs and the lang entries of every
+        # file in memory, and re-profiles whatever changes on disk
+        self.start_report()
+        try:
+            self.input_hashes = dict()
+            self.manifest = self.load_manifest()
+            with self.stage("get_langs"):
+                self.get_langs()
+            snapshot = self.snapshot()
+            self.run_steps()
+        finally:
+            self.finish_report()
+        self.log("FTBQuests profiling completed.")
+        self.log(f"Watching for changes every {interval}s. Press Ctrl+C to stop.")
+
+        try:
+            while True:
+                time.sleep(interval)
+                current = self.snapshot()
+                if current == snapshot:
+                    continue
+                # wait until the files stop changing, e.g. while saving
+                while True:
+                    time.sleep(debounce)
+                    settled = self.snapshot()
+                    if settled == current:
+                        break
+                    current = settled
+
+                changed_files = sorted(
+                    rel_path
+                    for rel_path in current[0].keys() | snapshot[0].keys()
+                    if current[0].get(rel_path) != snapshot[0].get(rel_path)
+                )
+                langs_changed = current[1] != snapshot[1]
+                snapshot = current
+                for rel_path in changed_files:
+                    self.log(f"Changed: {rel_path}")
+                if langs_changed:
+                    self.log("Changed: input lang files")
+                self.start_report()
+                try:
+                    self.reprofile(changed_files, langs_changed)
+                finally:
+                    self.finish_report()
+                self.log("FTBQuests profiling completed.")
+        except KeyboardInterrupt:
+            self.log("Stopped watching.")
+
+    def snapshot(self) -> tuple[dict[str, tuple[int, int]], dict[str, tuple[int, int]]]:
+        # (mtime, size) of the input .snbt files and of the input lang files
+        files: dict[str, tuple[int, int]] = dict()
+        for rel_path in self.input_files():
+            try:
+                stat = os.stat(os.path.join(self.in_ftbq_dir, rel_path))
+            except OSError:
+                continue
+            files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        langs: dict[str, tuple[int, int]] = dict()
+        for _, rel_path in self.lang_input_files():
+            try:
+                stat = os.stat(os.path.join(self.in_lang_dir, rel_path))
+            except OSError:
+                continue
+            langs[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return files, langs
+
+    def reprofile(self, changed_files: list[str], langs_changed: bool) -> None:
+        if langs_changed:
+            # every lang entry may resolve differently now
+            self.input_hashes = dict()
+            self.manifest = self.load_manifest()
+            with self.stage("get_langs"):
+                self.get_langs()
+        else:
+            # the entries of this run become the cache of the next one
+            for rel_path in changed_files:
+                self.input_hashes.pop(rel_path, None)
+            self.manifest.files = self.manifest.next_files
+            self.manifest.next_files = dict()
+        self.run_steps()
+
+    def manifest_path(self) -> str:
+        return os.path.join(self.out_ftbq_dir, ".profiler_manifest.json")
+
+    def load_manifest(self) -> Manifest:
+        # cached results are only valid for the same settings and input langs
+        config = {
+            "default_lang": self.default_lang,
+            "out_namespace": self.out_namespace,
+            "merge_raw_text": self.merge_raw_text,
+            "sort_lang": self.sort_lang,
+            "out_lang_dir": self.out_lang_dir,
+            "output_format": self.output_format,
+            "lang_layout": self.lang_layout,
+            "dedup": self.dedup,
+        }
+        langs: dict[str, str] = dict()
+        for _, rel_path in sorted(self.lang_input_files()):
+            langs[rel_path] = file_hash(os.path.join(self.in_lang_dir, rel_path))
+        return Manifest.load(self.manifest_path(), config, langs)
+
+    def input_files(self) -> list[str]:
+        # every file a full run would process, in processing order
+        rel_paths = [
+            file_name
+            for file_name in ("data.snbt", "chapter_groups.snbt")
+            if os.path.isfile(os.path.join(self.in_ftbq_dir, file_name))
+        ]
+        for dir_name in ("reward_tables", "chapters"):
+            dir_path = os.path.join(self.in_ftbq_dir, dir_name)
+            if not os.path.isdir(dir_path):
+                continue
+            for file_name in sorted(os.listdir(dir_path)):
+                if file_name.endswith(".snbt"):
+                    rel_paths.append(self.rel_path(dir_name, file_name))
+        return rel_paths
+
+    def is_up_to_date(self) -> bool:
+        manifest = self.manifest
+        if not manifest.files or not manifest.lang_codes:
+            return False
+        rel_paths = self.input_files()
+        if set(rel_paths) != set(manifest.files):
+            return False
+        for rel_path in rel_paths:
+            entry = manifest.lookup(rel_path, self.input_hash(rel_path))
+            if entry is None:
+                return False
+            if entry["written"] and not os.path.exists(
+                os.path.join(self.out_ftbq_dir, rel_path)
+            ):
+                return False
+        for lang_code in manifest.lang_codes:
+            if self.lang_layout == "sharded":
+                lang_path = os.path.join(self.out_lang_dir, lang_code)
+            else:
+                lang_path = os.path.join(self.out_lang_dir, f"{lang_code}.json")
+            if not os.path.exists(lang_path):
+                return False
+        return True
+
+    def lang_input_files(
+        self, warn: bool = False, lang_dir: str = ""
+    ) -> list[tuple[str, str]]:
+        # (lang code, path relative to lang_dir) of every lang file there,
+        # in_lang_dir by default: <lang>.json, or the shards <lang>/*.json of
+        # a sharded lang directory
+        files: list[tuple[str, str]] = []
+        if not lang_dir:
+            lang_dir = self.in_lang_dir
+        if not lang_dir or not os.path.isdir(lang_dir):
+            return files
+        for file_name in os.listdir(lang_dir):
+            if os.path.isdir(os.path.join(lang_dir, file_name)):
+                for shard_name in sorted(
+                    os.listdir(os.path.join(lang_dir, file_name))
+                ):
+                    if shard_name.endswith(".json"):
+                        files.append((file_name, f"{file_name}/{shard_name}"))
+                    elif warn:
+                        self.warn(
+                            f"Non-JSON file '{file_name}/{shard_name}' found in lang/. Skipping."
                         )
-                        continue
-                if not isinstance(lang_data, dict):
-                    self.error(
-                        f"Language file '{file_path}' does not contain a valid JSON object. Skipping."
-                    )
+            elif file_name.endswith(".json"):
+                files.append((file_name[:-5], file_name))
+            elif warn:
+                self.warn(f"Non-JSON file '{file_name}' found in lang/. Skipping.")
+        return files
+
+    def get_langs(self):
+        lang_files = self.lang_input_files(warn=True)
+        lang_codes = list(dict.fromkeys(lang_code for lang_code, _ in lang_files))
+        if self.default_lang not in lang_codes:
+            lang_codes.append(self.default_lang)
+
+        # filled one lang file at a time, so that only one is held as a dict
+        langs = LangStore(lang_codes)
+        read: set[str] = set()
+        for lang_code, rel_path in lang_files:
+            file_path = os.path.join(self.in_lang_dir, rel_path)
+            with open(file_path, "r", encoding="utf-8") as f:
+                try:
+                    lang_data = json.load(f)
+                except Exception as e:
+                    self.error(f"Failed to parse language file '{file_path}': {e}.")
                     continue
+            if not isinstance(lang_data, dict):
+                self.error(
+                    f"Language file '{file_path}' does not contain a valid JSON object. Skipping."
+                )
+                continue
+            if not all(isinstance(v, str) for v in lang_data.values()):
                 lang: dict[str, str] = dict()
                 for k, v in lang_data.items():
                     if not isinstance(v, str):
@@ -133,57 +628,639 @@ class FTBQuestProfiler:
                         )
                     else:
                         lang[k] = v
-                langs[lang_code] = lang
-        if self.default_lang not in langs:
-            langs[self.default_lang] = dict()
+                lang_data = lang
+            langs.set_column(lang_code, lang_data)
+            read.add(lang_code)
+        failed = {lang_code for lang_code, _ in lang_files} - read
+        if failed:
+            # a language none of whose files could be read gets no output
+            lang_codes = [
+                lang_code for lang_code in lang_codes if lang_code not in failed
+            ]
+            if self.default_lang not in lang_codes:
+                lang_codes.append(self.default_lang)
+            langs = langs.reorder(lang_codes)
         self.in_langs = langs
 
+    def new_langs(self) -> LangStore:
+        return LangStore(self.in_langs.lang_codes)
+
+    def merge_langs(self, fragment: LangStore) -> None:
+        self.out_langs.update(fragment)
+
+    def lang_shard(self, key: str) -> str:
+        # "ftbquests.chapter_xxx.quest_xxx.title" -> "chapter_xxx"
+        parts = key.split(".", 2)
+        if len(parts) > 1 and parts[0] == self.out_namespace:
+            shard = parts[1]
+        else:
+            shard = parts[0]
+        if shard.startswith("group_"):
+            return "groups"
+        if shard.startswith("reward_"):
+            return "reward_tables"
+        return shard
+
     def save_langs(self) -> None:
+        if not self.dry_run:
+            os.makedirs(self.out_lang_dir, exist_ok=True)
         langs = self.out_langs
-        for lang_code, lang_data in langs.items():
-            file_path = os.path.join(self.out_lang_dir, f"{lang_code}.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(
-                    lang_data,
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                    sort_keys=self.sort_lang,
-                )
+        saved = self.saved_langs
+        if self.lang_layout == "sharded":
+            # <lang>/<shard>.json, every shard compared and written on its own
+            parts = langs.split(self.lang_shard)
+            saved_parts = saved.split(self.lang_shard) if saved is not None else {}
+        else:
+            parts = {None: langs}
+            saved_parts = {None: saved}
+        files = []
+        for lang_code in langs.lang_codes:
+            if self.lang_layout == "sharded":
+                self.prepare_shard_dir(lang_code, parts)
+            for shard, part in parts.items():
+                if shard is None:
+                    file_path = os.path.join(self.out_lang_dir, f"{lang_code}.json")
+                else:
+                    file_path = os.path.join(
+                        self.out_lang_dir, lang_code, f"{shard}.json"
+                    )
+                entries = part.items(lang_code)
+                previous = saved_parts.get(shard)
+                if (
+                    previous is not None
+                    and lang_code in previous.lang_index
+                    and previous.items(lang_code) == entries
+                    and os.path.exists(file_path)
+                ):
+                    # unchanged since the previous save of this profiler
+                    continue
+                files.append((file_path, entries))
+        LangWriter(
+            sort=self.sort_lang,
+            jobs=self.jobs,
+            output=None if self.write_mode == "always" else self.output.write_text,
+        ).write_many(files)
+        if self.dry_run:
+            self.log_lang_changes(files)
+        self.saved_langs = langs
+
+    def log_lang_changes(self, files: list[tuple[str, list]]) -> None:
+        # dry run: the lang keys each changed lang file would gain, lose or
+        # change, against the file on disk
+        changed = set(self.output.changed)
+        for file_path, entries in files:
+            if file_path not in changed:
+                continue
+            old: dict = dict()
+            if os.path.exists(file_path):
+                try:
+                    with open(file_path, "r", encoding="utf-8") as f:
+                        old = json.load(f)
+                except ValueError:
+                    pass
+            new = dict(entries)
+            added = sum(1 for key in new if key not in old)
+            removed = sum(1 for key in old if key not in new)
+            modified = sum(
+                1 for key, value in new.items() if key in old and old[key] != value
+            )
+            rel_path = os.path.relpath(file_path, self.out_lang_dir)
+            self.log(
+                f"Would write lang file {rel_path}: {added} keys added, "
+                f"{removed} removed, {modified} changed."
+            )
+
+    def prepare_shard_dir(self, lang_code: str, parts: dict) -> None:
+        # shards of chapters that no longer exist would be read back as input
+        lang_dir = os.path.join(self.out_lang_dir, lang_code)
+        if self.dry_run:
+            if not os.path.isdir(lang_dir):
+                return
+        else:
+            os.makedirs(lang_dir, exist_ok=True)
+        for file_name in os.listdir(lang_dir):
+            if file_name.endswith(".json") and file_name[:-5] not in parts:
+                if self.dry_run:
+                    self.log(
+                        f"Would remove stale lang shard: {lang_code}/{file_name}"
+                    )
+                    continue
+                os.remove(os.path.join(lang_dir, file_name))
+                self.log(f"Removed stale lang shard: {lang_code}/{file_name}")
+
+    def dedup_langs(self) -> None:
+        # keys holding the same text in every language, e.g. "Reward" or a
+        # repeated description line; in "shared" mode each such cluster gets
+        # one key, and the held back outputs are written referring to it
+        langs = self.out_langs
+        default = langs.lang_index[self.default_lang]
+        clusters = langs.clusters()
+        redundant = sum(len(keys) - 1 for keys in clusters)
+        self.log(
+            f"Duplicate lang values: {len(clusters)} clusters, "
+            f"{redundant} redundant entries per language."
+        )
+        # largest first, stable for clusters of the same size
+        for keys in sorted(clusters, key=len, reverse=True)[:10]:
+            value = langs.row(keys[0])[default]
+            self.log(f"  {len(keys)}x {value[:40]!r}: {keys[0]}, ...")
+
+        names = self.shared_keys(clusters) if self.deferred is not None else {}
+        if self.run_report is not None:
+            self.run_report.add_section(
+                "dedup",
+                [
+                    {
+                        "value": langs.row(keys[0])[default],
+                        "keys": keys,
+                        "shared_key": names.get(keys[0]),
+                    }
+                    for keys in clusters
+                ],
+            )
+        if self.deferred is None:
+            return
+
+        self.out_langs = langs.rename(names)
+        self.log(f"Shared lang keys: {len(clusters)}, replacing {len(names)} keys.")
+        deferred, self.deferred = self.deferred, None
+        # references are "{key}" strings, or "translate" fields of JSON
+        # descriptions where the key ends at an escaped quote
+        reference = re.compile(re.escape(self.out_namespace + ".") + r'[^{}"\\]+')
+
+        def rename(match: re.Match) -> str:
+            key = match.group()
+            return names.get(key, key)
+
+        for text, file_path, stats in deferred:
+            self.write_output(reference.sub(rename, text), file_path, stats)
+
+    def shared_keys(self, clusters: list[list[str]]) -> dict[str, str]:
+        # key -> shared key, named by a hash of the default language value so
+        # that it stays the same between runs; a cluster with the same value
+        # but other translations gets a numbered suffix
+        import hashlib
+
+        default = self.out_langs.lang_index[self.default_lang]
+        names: dict[str, str] = dict()
+        taken: set[str] = set()
+        for keys in clusters:
+            value = self.out_langs.row(keys[0])[default]
+            digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:10]
+            shared = name = f"{self.out_namespace}.shared.{digest}"
+            suffix = 2
+            while name in taken:
+                name = f"{shared}_{suffix}"
+                suffix += 1
+            taken.add(name)
+            for key in keys:
+                names[key] = name
+        return names
 
     def do_chapters(self) -> None:
+        self.process_files(*self.chapters_files())
+
+    def chapters_files(self) -> tuple[str, list[str], str]:
+        # (directory, file names, handler) of a step, see run_steps
         dir_name = "chapters"
+        file_names = self.select_files(dir_name, self.list_snbt_files(dir_name))
+        return dir_name, file_names, "do_chapter"
+
+    def list_snbt_files(self, dir_name: str) -> list[str]:
         dir_path = os.path.join(self.in_ftbq_dir, dir_name)
         if not os.path.exists(dir_path):
             self.warn(
                 f"'{dir_name}' directory not found in FTBQuests directory. Skipping."
             )
-            return
+            return []
 
-        # iter all .snbt files in the chapters directory
-        for file_name in os.listdir(dir_path):
+        # sorted, so that lang entries are merged in a stable order
+        file_names: list[str] = []
+        for file_name in sorted(os.listdir(dir_path)):
             if not file_name.endswith(".snbt"):
                 self.warn(
-                    f"Non-snbt file '{file_name}' found in chapters/. Skipping."
+                    f"Non-snbt file '{file_name}' found in {dir_name}/. Skipping."
                 )
                 continue
-
-            file_path = os.path.join(dir_path, file_name)
+            file_names.append(file_name)
+        return file_names
+
+    def select_files(self, dir_name: str, file_names: list[str]) -> list[str]:
+        # the files of a step the selection keeps; the others are left alone,
+        # and so is their previous output
+        if self.selection is None:
+            return file_names
+        selected: list[str] = []
+        for file_name in file_names:
+            rel_path = self.rel_path(dir_name, file_name)
+            ids = cache(lambda: self.chapter_ids(rel_path))
+            if self.selection.selects(rel_path, ids):
+                selected.append(file_name)
+                self.selected.add(rel_path)
+            elif self.manifest is not None:
+                # still describes the output on disk, for later runs
+                entry = self.manifest.files.get(rel_path)
+                if entry is not None:
+                    self.manifest.keep(rel_path, entry)
+        skipped = len(file_names) - len(selected)
+        if skipped and dir_name:
+            self.log(f"Skipping {skipped} unselected files in {dir_name}/.")
+        elif skipped:
+            self.log(f"Skipping unselected {file_names[0]}.")
+        return selected
+
+    def chapter_ids(self, rel_path: str) -> tuple[str | None, set[str]]:
+        # (chapter id, quest ids) of a chapter file, parsed only if its text
+        # contains an id the selection looks for
+        file_path = os.path.join(self.in_ftbq_dir, rel_path)
+        text = self.read_input(file_path)
+        if text is None or not any(id in text for id in self.selection.wanted):
+            return None, set()
+        try:
+            chapter = self.file_to_snbt(file_path, text)
+        except Exception:
+            return None, set()
+        chapter_id = chapter.get("id")
+        quest_ids: set[str] = set()
+        quests = chapter.get("quests")
+        if isinstance(quests, SNBTList):
+            for quest in quests:
+                if isinstance(quest, SNBT) and isinstance(quest.get("id"), String):
+                    quest_ids.add(quest["id"].raw())
+        if not isinstance(chapter_id, String):
+            return None, quest_ids
+        return chapter_id.raw(), quest_ids
+
+    def keep_unselected_langs(self) -> None:
+        # the lang entries of files this run did not select, read back from
+        # the output lang files, merged in file order with those of this run
+        rel_paths = self.input_files()
+        unselected = [
+            rel_path for rel_path in rel_paths if rel_path not in self.selected
+        ]
+        if not unselected:
+            return
+        previous = self.read_out_langs()
+        if previous is None:
+            self.warn(
+                "No output lang files found, the lang entries of unselected files are missing."
+            )
+            return
+        owners = set(rel_paths)
+
+        def owner(key: str) -> str:
+            return self.key_owner(key, owners)
+
+        current_parts = self.out_langs.split(owner)
+        previous_parts = previous.split(owner)
+        merged = self.new_langs()
+        kept = 0
+        for rel_path in rel_paths:
+            if rel_path in self.selected:
+                part = current_parts.get(rel_path)
+            else:
+                part = previous_parts.get(rel_path)
+                kept += len(part) if part is not None else 0
+            if part is not None:
+                merged.update(part)
+        # keys no input file produces, e.g. of a chapter deleted since
+        for part in (previous_parts.get(""), current_parts.get("")):
+            if part is not None:
+                merged.update(part)
+        self.out_langs = merged
+        self.log(
+            f"Kept {kept} lang keys of {len(unselected)} unselected files."
+        )
+
+    def read_out_langs(self) -> LangStore | None:
+        # the output lang files of a previous run, in either layout, None if
+        # there are none; a language missing from them gets the default
+        # language's values
+        langs = self.new_langs()
+        found = False
+        for lang_code, rel_path in self.lang_input_files(lang_dir=self.out_lang_dir):
+            if lang_code not in langs.lang_index:
+                continue
+            file_path = os.path.join(self.out_lang_dir, rel_path)
             try:
-                snbt_obj = self.file_to_snbt(file_path)
-            except Exception:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    lang_data = json.load(f)
+            except (OSError, ValueError) as e:
+                self.warn(f"Failed to read output language file '{file_path}': {e}.")
+                continue
+            if not isinstance(lang_data, dict):
+                continue
+            langs.set_column(
+                lang_code,
+                {k: v for k, v in lang_data.items() if isinstance(v, str)},
+            )
+            found = True
+        if not found:
+            return None
+        default = langs.lang_index[self.default_lang]
+        rows = langs.rows
+        for i, row in enumerate(rows):
+            if None in row:
+                rows[i] = tuple(
+                    row[default] if value is None else value for value in row
+                )
+        return langs
+
+    def key_owner(self, key: str, rel_paths: set[str]) -> str:
+        # the input file (of rel_paths) a lang key is produced by, see the
+        # do_* handlers, "" for none
+        prefix = self.out_namespace + "."
+        if not key.startswith(prefix):
+            return ""
+        rest = key[len(prefix) :]
+        if rest.startswith("data."):
+            return "data.snbt"
+        if rest.startswith("group_"):
+            return "chapter_groups.snbt"
+        for dir_name, kind in (("chapters", "chapter_"), ("reward_tables", "reward_")):
+            if rest.startswith(kind):
+                parts = rest[len(kind) :].split(".")
+                # file names may contain dots, the longest existing one wins
+                for i in range(len(parts) - 1, 0, -1):
+                    rel_path = f"{dir_name}/{'.'.join(parts[:i])}.snbt"
+                    if rel_path in rel_paths:
+                        return rel_path
+        return ""
+
+    def process_files(
+        self, dir_name: str, file_names: list[str], handler: str
+    ) -> None:
+        hashes, cached = self.lookup_cached(dir_name, file_names)
+        todo = [file_name for file_name in file_names if file_name not in cached]
+
+        if self.jobs <= 1 or len(todo) < 2:
+            results = (
+                self.process_file(dir_name, file_name, handler) + ("",)
+                for file_name in todo
+            )
+        else:
+            # map() keeps the input order, so merging stays deterministic
+            results = self.get_pool().map(
+                profiler_pool.process_file,
+                repeat(dir_name),
+                todo,
+                repeat(handler),
+            )
+
+        for file_name in file_names:
+            if file_name in cached:
+                self.merge_cached(dir_name, file_name, cached[file_name])
                 continue
+            output = self.merge_result(dir_name, file_name, hashes, next(results))
+            if output is not None:
+                self.write_output(*output)
+
+    async def process_files_async(
+        self,
+        dir_name: str,
+        file_names: list[str],
+        handler: str,
+        transformer: ThreadPoolExecutor,
+        read_ahead: int,
+        write_behind: int,
+    ) -> None:
+        # the same steps as process_files; with a process pool the workers
+        # read ahead themselves, otherwise reads run on the default executor
+        # and transforms on the transformer thread
+        import asyncio
+
+        hashes, cached = self.lookup_cached(dir_name, file_names)
+        todo = [file_name for file_name in file_names if file_name not in cached]
+        loop = asyncio.get_running_loop()
+        pooled = self.jobs > 1 and len(todo) >= 2
+        if pooled:
+            pool = self.get_pool()
+
+        def submit(file_name: str) -> asyncio.Future:
+            if pooled:
+                return loop.run_in_executor(
+                    pool, profiler_pool.process_file, dir_name, file_name, handler
+                )
+            file_path = os.path.join(self.in_ftbq_dir, dir_name, file_name)
+            return loop.run_in_executor(None, self.read_input, file_path)
 
-            self.do_chapter(file_name, snbt_obj)
+        pending = deque(submit(file_name) for file_name in todo[:read_ahead])
+        upcoming = iter(todo[read_ahead:])
+        outputs: asyncio.Queue = asyncio.Queue(maxsize=write_behind)
+        writer = asyncio.create_task(self.write_outputs(outputs))
+        try:
+            for file_name in file_names:
+                if file_name in cached:
+                    self.merge_cached(dir_name, file_name, cached[file_name])
+                    continue
+                result = await pending.popleft()
+                for next_file in islice(upcoming, 1):
+                    pending.append(submit(next_file))
+                if not pooled:
+                    result = await loop.run_in_executor(
+                        transformer,
+                        self.process_file,
+                        dir_name,
+                        file_name,
+                        handler,
+                        result,
+                    ) + ("",)
+                output = self.merge_result(dir_name, file_name, hashes, result)
+                if output is not None:
+                    await outputs.put(output)
+            await outputs.put(None)
+            await writer
+        finally:
+            if not writer.done():
+                writer.cancel()
+            for future in pending:
+                future.cancel()
+
+    async def write_outputs(self, outputs: asyncio.Queue) -> None:
+        import asyncio
+
+        while True:
+            output = await outputs.get()
+            if output is None:
+                return
+            await asyncio.to_thread(self.write_output, *output)
 
-            # write back to output directory
-            out_file_dir_path = os.path.join(self.out_ftbq_dir, dir_name)
-            if not os.path.exists(out_file_dir_path):
-                os.makedirs(out_file_dir_path)
-            out_file_path = os.path.join(self.out_ftbq_dir, dir_name, file_name)
-            self.snbt_to_file(snbt_obj, out_file_path)
+    def get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            from concurrent.futures import ProcessPoolExecutor
 
-    def do_chapter(self, file_name: str, chapter: SNBT) -> None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.jobs,
+                initializer=profiler_pool.init_worker,
+                initargs=(self,),
+            )
+        return self.pool
+
+    def get_parser(self) -> SNBTParser:
+        if self.parser is None:
+            self.parser = SNBTParser(
+                lexer=self.snbt_lexer, engine=self.snbt_engine, cache=self.parse_cache
+            )
+        return self.parser
+
+    def get_rich_text(self) -> RichTextCache:
+        if self.rich_text is None:
+            self.rich_text = RichTextCache(self.rich_text_cache)
+        return self.rich_text
+
+    def shutdown_pool(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def lookup_cached(
+        self, dir_name: str, file_names: list[str]
+    ) -> tuple[dict[str, str], dict[str, dict]]:
+        # in incremental mode, unchanged files reuse their cached lang entries
+        hashes: dict[str, str] = dict()
+        cached: dict[str, dict] = dict()
+        if self.manifest is not None:
+            for file_name in file_names:
+                rel_path = self.rel_path(dir_name, file_name)
+                hashes[file_name] = self.input_hash(rel_path)
+                if self.dedup == "shared":
+                    # shared keys depend on every file, whose output is
+                    # rewritten, so only the input hashes are kept
+                    continue
+                entry = self.manifest.lookup(rel_path, hashes[file_name])
+                if entry is not None and (
+                    not entry["written"]
+                    or os.path.exists(os.path.join(self.out_ftbq_dir, rel_path))
+                ):
+                    cached[file_name] = entry
+        return hashes, cached
+
+    def merge_cached(self, dir_name: str, file_name: str, entry: dict) -> None:
+        rel_path = self.rel_path(dir_name, file_name)
+        self.merge_langs(
+            LangStore.from_json(entry["langs"], self.in_langs.lang_codes)
+        )
+        self.manifest.keep(rel_path, entry)
+        if self.run_report is not None:
+            self.run_report.add_file(rel_path, {"cached": True})
+
+    def merge_result(
+        self,
+        dir_name: str,
+        file_name: str,
+        hashes: dict[str, str],
+        result: tuple[str | None, LangStore, dict | None, str],
+    ) -> tuple[str, str, dict | None] | None:
+        # merges what process_file produced, in file order, and returns the
+        # (text, output path, stats) left to write, if any
+        rel_path = self.rel_path(dir_name, file_name)
+        text, fragment, stats, output = result
+        if output:
+            # log messages captured in a worker process
+            sys.stdout.write(output)
+        self.merge_langs(fragment)
+        if self.manifest is not None:
+            self.manifest.record(
+                rel_path, hashes[file_name], text is not None, fragment
+            )
+        if self.run_report is not None:
+            self.run_report.add_file(rel_path, stats)
+        if text is None:
+            return None
+        output = text, os.path.join(self.out_ftbq_dir, dir_name, file_name), stats
+        if self.deferred is not None:
+            self.deferred.append(output)
+            return None
+        return output
+
+    def write_output(self, text: str, file_path: str, stats: dict | None) -> None:
+        # write back to output directory
+        if not self.dry_run:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        clock = time.perf_counter()
+        written = self.str_to_file(text, file_path)
+        if stats is not None:
+            stats["write_s"] = time.perf_counter() - clock
+            stats["bytes_written"] = written
+        if self.dry_run and written:
+            rel_path = os.path.relpath(file_path, self.out_ftbq_dir)
+            self.log(f"Would write {rel_path}.")
+
+    def rel_path(self, dir_name: str, file_name: str) -> str:
+        return f"{dir_name}/{file_name}" if dir_name else file_name
+
+    def input_hash(self, rel_path: str) -> str:
+        if rel_path not in self.input_hashes:
+            self.input_hashes[rel_path] = file_hash(
+                os.path.join(self.in_ftbq_dir, rel_path)
+            )
+        return self.input_hashes[rel_path]
+
+    def process_file(
+        self,
+        dir_name: str,
+        file_name: str,
+        handler: str,
+        text: str | None = None,
+    ) -> tuple[str | None, LangStore, dict | None]:
+        # parse and transform one file, collecting its lang entries apart,
+        # plus its timings and counters when a run report is requested;
+        # text is the file's content when it was read ahead
+        file_path = os.path.join(self.in_ftbq_dir, dir_name, file_name)
+        fragment = self.new_langs()
+        timer = FileTimer(file_path) if self.report else None
+        out_langs = self.out_langs
+        self.out_langs = fragment
+        self.strings_replaced = 0
+        rich_text = self.get_rich_text()
+        hits, misses, skipped = rich_text.counters()
+        cache = self.parse_cache
+        cache_hits = cache.hits if cache is not None else 0
+        try:
+            text = self.transform_file(file_path, file_name, handler, timer, text)
+        finally:
+            self.out_langs = out_langs
+        if timer is None:
+            return text, fragment, None
+        stats = timer.done(
+            strings_replaced=self.strings_replaced,
+            lang_keys=len(fragment),
+            rich_text_hits=rich_text.hits - hits,
+            rich_text_misses=rich_text.misses - misses,
+            plain_text_lines=rich_text.skipped - skipped,
+            parse_cache_hits=cache.hits - cache_hits if cache is not None else 0,
+        )
+        return text, fragment, stats
+
+    def transform_file(
+        self,
+        file_path: str,
+        file_name: str,
+        handler: str,
+        timer: FileTimer | None,
+        text: str | None = None,
+    ) -> str | None:
+        try:
+            if self.output_format == "patch":
+                snbt_obj, source = self.file_to_source(file_path, text)
+            else:
+                snbt_obj, source = self.file_to_snbt(file_path, text), None
+        except Exception:
+            return None
+        if timer is not None:
+            timer.lap("parse")
+            timer.count(snbt_obj)
+        written = getattr(self, handler)(file_name, snbt_obj)
+        if timer is not None:
+            timer.lap("transform")
+        if not written:
+            return None
+        text = self.snbt_to_str(snbt_obj, source)
+        if timer is not None:
+            timer.lap("serialize")
+        return text
+
+    def do_chapter(self, file_name: str, chapter: SNBT) -> bool:
         # handle chapter title
         if "title" in chapter:
             chapter_title = chapter["title"]
@@ -191,7 +1268,7 @@ class FTBQuestProfiler:
                 self.error(
                     f"Chapter '{file_name}' title is not a string. Skipping."
                 )
-                return
+                return True
 
             if chapter_title:
                 new_key = f"{self.out_namespace}.chapter_{file_name[:-5]}.title"
@@ -208,7 +1285,7 @@ class FTBQuestProfiler:
                 self.error(
                     f"Chapter '{file_name}' subtitle is not a list. Skipping."
                 )
-                return
+                return True
             for i, chapter_subtitle in enumerate(chapter_subtitles):
                 if not isinstance(chapter_subtitle, String):
                     self.error(
@@ -236,7 +1313,7 @@ class FTBQuestProfiler:
                 self.error(
                     f"Chapter '{file_name}' quests is not a list. Skipping."
                 )
-                return
+                return True
             for quest in quests:
                 if not isinstance(quest, SNBT):
                     self.warn(
@@ -245,6 +1322,8 @@ class FTBQuestProfiler:
                     continue
                 self.do_quest(file_name, quest)
 
+        return True
+
     def do_quest(self, file_name: str, quest: SNBT) -> None:
         # get id
         if "id" not in quest:
@@ -405,49 +1484,41 @@ class FTBQuestProfiler:
                     descs_to_merge.append("")
                     continue
 
-                if desc == "{@pagebreak}":
+                raw_desc = desc.raw()
+                kind, json_obj = self.get_rich_text().classify(raw_desc)
+
+                if kind == PAGEBREAK:
                     # flush merged descriptions
                     flush_merged_descriptions()
                     # add pagebreak entry
                     new_description.append(String("{@pagebreak}"))
                     continue
 
-                raw_desc = desc.raw()
-
-                try:
-                    json_obj = json.loads(raw_desc)
-                    is_json = True
-                except Exception:
-                    # not a json
-                    json_obj = None
-                    is_json = False
-
-                if not is_json:
-                    # test if it's a key
-                    if raw_desc[0] == "{" and raw_desc[-1] == "}":
-                        key = raw_desc[1:-1]
-                        if key.strip().startswith("image:"):
-                            # serve as image entries
-                            # flush merged descriptions
-                            flush_merged_descriptions()
-                            new_description.append(String(raw_desc))
-                            continue
+                if kind == IMAGE:
+                    # serve as image entries
+                    # flush merged descriptions
+                    flush_merged_descriptions()
+                    new_description.append(String(raw_desc))
+                    continue
 
-                        if key in self.in_langs[self.default_lang]:
-                            value = self.in_langs[self.default_lang][key]
-                        else:
-                            # not found, warn and serve as raw text
-                            self.warn(
-                                f"Localization key '{key}' in file '{file_name}' not found in '{self.default_lang}.json' lang file. Serving as raw text."
-                            )
-                            value = raw_desc
-                    else:
+                if kind == KEY:
+                    key = raw_desc[1:-1]
+                    value = self.in_langs.get(self.default_lang, key)
+                    if value is None:
+                        # not found, warn and serve as raw text
+                        self.warn(
+                            f"Localization key '{key}' in file '{file_name}' not found in '{self.default_lang}.json' lang file. Serving as raw text."
+                        )
                         value = raw_desc
-
                     # add to merge list
                     descs_to_merge.append(value)
                     continue
 
+                if kind == PLAIN:
+                    # add to merge list
+                    descs_to_merge.append(raw_desc)
+                    continue
+
                 # is a json object
                 flush_merged_descriptions()
                 if not json_obj:
@@ -509,16 +1580,9 @@ class FTBQuestProfiler:
                     continue
 
                 raw_desc = desc.raw()
+                kind, json_obj = self.get_rich_text().classify(raw_desc)
 
-                try:
-                    json_obj = json.loads(raw_desc)
-                    is_json = True
-                except Exception:
-                    # not a json
-                    json_obj = None
-                    is_json = False
-
-                if not is_json:
+                if kind != JSON:
                     new_key = f"{self.out_namespace}.chapter_{file_name[:-5]}.quest_{quest_id.raw()}.desc_{counter:02d}"
                     self.update_out_langs(raw_desc, file_name, new_key)
 
@@ -570,82 +1634,64 @@ class FTBQuestProfiler:
                     continue
 
     def do_reward_tables(self) -> None:
-        dir_name = "reward_tables"
-        dir_path = os.path.join(self.in_ftbq_dir, dir_name)
-        if not os.path.exists(dir_path):
-            self.warn(
-                f"'{dir_name}' directory not found in FTBQuests directory. Skipping."
-            )
-            return
+        self.process_files(*self.reward_tables_files())
 
-        # iter all .snbt files in the reward_tables directory
-        for file_name in os.listdir(dir_path):
-            if not file_name.endswith(".snbt"):
-                self.warn(
-                    f"Non-snbt file '{file_name}' found in reward_tables/. Skipping."
-                )
-                continue
+    def reward_tables_files(self) -> tuple[str, list[str], str]:
+        dir_name = "reward_tables"
+        file_names = self.select_files(dir_name, self.list_snbt_files(dir_name))
+        return dir_name, file_names, "do_reward_table"
 
-            file_path = os.path.join(dir_path, file_name)
-            try:
-                snbt_obj = self.file_to_snbt(file_path)
-            except Exception:
-                continue
+    def do_reward_table(self, file_name: str, snbt_obj: SNBT) -> bool:
+        if "title" not in snbt_obj:
+            return False
 
-            if "title" not in snbt_obj:
-                continue
+        # translate the title
+        title_string = snbt_obj["title"]
+        if not isinstance(title_string, String):
+            self.error(
+                f"Reward table '{file_name}' title is not a string. Skipping."
+            )
+            return False
 
-            # translate the title
-            title_string = snbt_obj["title"]
-            if not isinstance(title_string, String):
-                self.error(
-                    f"Reward table '{file_name}' title is not a string. Skipping."
-                )
-                continue
+        if not title_string:
+            # skip empty title
+            return False
 
-            if not title_string:
-                # skip empty title
-                continue
-
-            key = f"{self.out_namespace}.reward_{file_name[:-5]}.title"
-            self.update_out_langs(title_string.raw(), file_name, key)
+        key = f"{self.out_namespace}.reward_{file_name[:-5]}.title"
+        self.update_out_langs(title_string.raw(), file_name, key)
 
-            # modify the snbt object
-            snbt_obj["title"] = String(f"{{{key}}}")
-            # write back to output directory
-            out_file_dir_path = os.path.join(self.out_ftbq_dir, dir_name)
-            if not os.path.exists(out_file_dir_path):
-                os.makedirs(out_file_dir_path)
-            out_file_path = os.path.join(self.out_ftbq_dir, dir_name, file_name)
-            self.snbt_to_file(snbt_obj, out_file_path)
-            # done
+        # modify the snbt object
+        snbt_obj["title"] = String(f"{{{key}}}")
+        # done
+        return True
 
     def do_chapter_groups(self) -> None:
+        self.process_files(*self.chapter_groups_files())
+
+    def chapter_groups_files(self) -> tuple[str, list[str], str]:
         file_name = "chapter_groups.snbt"
         file_path = os.path.join(self.in_ftbq_dir, file_name)
         if not os.path.exists(file_path):
             self.warn(
                 f"'{file_name}' not found in FTBQuests directory. Skipping."
             )
-            return
+            return "", [], "do_chapter_groups_file"
 
-        try:
-            snbt_obj = self.file_to_snbt(file_path)
-        except Exception:
-            return
+        return "", self.select_files("", [file_name]), "do_chapter_groups_file"
 
+    def do_chapter_groups_file(self, file_name: str, snbt_obj: SNBT) -> bool:
         if not "chapter_groups" in snbt_obj:
             self.error(
                 f"'{file_name}' does not contain 'chapter_groups' key. Skipping."
             )
-            return
+            return False
 
         groups = snbt_obj["chapter_groups"]
         if not isinstance(groups, SNBTList):
             self.error(
                 f"'chapter_groups' in '{file_name}' is not a list. Skipping."
             )
-            return
+            return False
 
         for elem in groups:
             if not isinstance(elem, SNBT):
@@ -687,11 +1733,12 @@ class FTBQuestProfiler:
             # done in this group
 
         # after all groups processed, write back to output directory
-        out_file_path = os.path.join(self.out_ftbq_dir, file_name)
-        self.snbt_to_file(snbt_obj, out_file_path)
-        # done
+        return True
 
     def do_data(self) -> None:
+        self.process_files(*self.data_files())
+
+    def data_files(self) -> tuple[str, list[str], str]:
         file_name = "data.snbt"
         file_path = os.path.join(self.in_ftbq_dir, file_name)
 
@@ -699,13 +1746,11 @@ class FTBQuestProfiler:
             self.warn(
                 f"'{file_name}' not found in FTBQuests directory. Skipping."
             )
-            return
+            return "", [], "do_data_file"
 
-        try:
-            snbt_obj = self.file_to_snbt(file_path)
-        except Exception:
-            return
+        return "", self.select_files("", [file_name]), "do_data_file"
 
+    def do_data_file(self, file_name: str, snbt_obj: SNBT) -> bool:
         for key in ["title", "lock_message"]:
             if key in snbt_obj:
                 value = snbt_obj[key]
@@ -727,50 +1772,228 @@ class FTBQuestProfiler:
                 # done in this key
 
         # after all keys processed, write back to output directory
-        out_file_path = os.path.join(self.out_ftbq_dir, file_name)
-        self.snbt_to_file(snbt_obj, out_file_path)
-
-    def file_to_snbt(self, file_path: str) -> SNBT:
-        with open(file_path, "r", encoding="utf-8") as src:
+        return True
+
+    def bake(self, lang_code: str = "") -> None:
+        # the reverse of profile(): the input .snbt files are profiled ones,
+        # and their lang keys are replaced with the text of lang_code (the
+        # quest language by default) from the input lang files, so that the
+        # output quests need no lang file; none is written
+        if not self.in_lang_dir:
+            raise ValueError("Baking needs an input language directory.")
+        if not lang_code:
+            lang_code = self.default_lang
+        if self.incremental:
+            self.warn("Incremental mode is not used when baking.")
+        self.start_report()
+        try:
+            with self.stage("get_langs"):
+                self.get_langs()
+            if lang_code not in self.in_langs.lang_index:
+                raise ValueError(
+                    f"No lang file for '{lang_code}' in the input language directory."
+                )
+            self.log(f"Baking language: {lang_code}")
+            # one hash index of the whole language, shipped once to every
+            # pool worker
+            self.baked_lang_code = lang_code
+            self.baked_lang = self.in_langs.to_dict(lang_code)
+            self.input_hashes = dict()
+            self.manifest = None
+            self.out_langs = self.new_langs()
+            self.output.reset()
+            self.deferred = None
             try:
-                snbt_obj = self.parser.parse_file(src)
+                for step, step_files in (
+                    ("data", self.data_files),
+                    ("chapter_groups", self.chapter_groups_files),
+                    ("reward_tables", self.reward_tables_files),
+                    ("chapters", self.chapters_files),
+                ):
+                    dir_name, file_names, _ = step_files()
+                    with self.stage(step):
+                        self.process_files(dir_name, file_names, "bake_file")
+            finally:
+                self.shutdown_pool()
+            self.log_written()
+            self.log("FTBQuests baking completed.")
+        finally:
+            self.finish_report()
+
+    def bake_file(self, file_name: str, snbt_obj: SNBT) -> bool:
+        # every "{key}" string of the tree, and the "translate" components
+        # of JSON description lines, in one pass over the file
+        stack: list[SNBT | SNBTList] = [snbt_obj]
+        while stack:
+            container = stack.pop()
+            if isinstance(container, SNBT):
+                items = container.items()
+            else:
+                items = enumerate(container)
+            for key, value in items:
+                if isinstance(value, String):
+                    baked = self.bake_string(value, file_name)
+                    if baked is not None:
+                        container[key] = String(baked)
+                elif key == "description" and isinstance(value, SNBTList):
+                    container[key] = self.bake_description(file_name, value)
+                elif isinstance(value, SNBT) or (
+                    isinstance(value, SNBTList) and value.values is None
+                ):
+                    # packed lists hold numbers only
+                    stack.append(value)
+        # every file is written, the output quests are complete
+        return True
+
+    def bake_description(
+        self, file_name: str, descriptions: SNBTList
+    ) -> SNBTList:
+        baked_description = SNBTList()
+        for desc in descriptions:
+            if not isinstance(desc, String) or not desc:
+                baked_description.append(desc)
+                continue
+            raw_desc = desc.raw()
+            kind, json_obj = self.get_rich_text().classify(raw_desc)
+            # a key profile() made of merged lines (merge_raw_text) comes
+            # back as those lines, one entry each; a JSON line is written
+            # again by json.dumps, its keys in the order of the profiled file
+            # (where profile() put "translate" last) but its spacing json's
+            if kind == KEY:
+                value = self.baked_text(raw_desc[1:-1], file_name)
+                if value is not None:
+                    baked_description.extend(
+                        String(line) for line in value.split("\n")
+                    )
+                    continue
+            elif kind == JSON and self.bake_json(json_obj, file_name):
+                baked_description.append(
+                    String(json.dumps(json_obj, ensure_ascii=False))
+                )
+                continue
+            baked_description.append(desc)
+        return baked_description
+
+    def bake_json(self, json_obj, file_name: str) -> bool:
+        # the components profile() made, at the top level or in a top-level
+        # array, get their text back instead of "translate"
+        components = json_obj if isinstance(json_obj, list) else [json_obj]
+        baked = False
+        for component in components:
+            if not isinstance(component, dict):
+                continue
+            key = component.get("translate")
+            if not isinstance(key, str):
+                continue
+            value = self.baked_text(key, file_name)
+            if value is None:
+                continue
+            # "text" takes the place of "translate", the other keys keep
+            # their order
+            items = [
+                ("text", value) if name == "translate" else (name, item)
+                for name, item in component.items()
+            ]
+            component.clear()
+            component.update(items)
+            baked = True
+        return baked
+
+    def bake_string(self, string: String, file_name: str) -> str | None:
+        raw = string.raw()
+        if len(raw) < 3 or raw[0] != "{" or raw[-1] != "}":
+            return None
+        return self.baked_text(raw[1:-1], file_name)
+
+    def baked_text(self, key: str, file_name: str) -> str | None:
+        value = self.baked_lang.get(key)
+        if value is None:
+            if key.startswith(self.out_namespace + "."):
+                # one of ours, other keys are left to the game
+                self.warn(
+                    f"Localization key '{key}' in file '{file_name}' not found in '{self.baked_lang_code}' lang file. Keeping the key."
+                )
+            return None
+        self.strings_replaced += 1
+        return value
+
+    def read_input(self, file_path: str) -> str | None:
+        # the text file_to_snbt or file_to_source would read, None if it
+        # cannot be read and should fail there as usual
+        newline = "" if self.output_format == "patch" else None
+        try:
+            with open(file_path, "r", encoding="utf-8", newline=newline) as src:
+                return src.read()
+        except (OSError, ValueError):
+            return None
+
+    def file_to_snbt(self, file_path: str, text: str | None = None) -> SNBT:
+        if text is None:
+            src = open(file_path, "r", encoding="utf-8")
+        else:
+            src = StringIO(text)
+            # for the parser's error messages
+            src.name = file_path
+        parser = self.get_parser()
+        with src:
+            try:
+                snbt_obj = parser.parse_file(src)
             except Exception as e:
                 self.error(f"Failed to parse SNBT file '{file_path}': {e}.")
-                self.parser.restart()
+                parser.restart()
                 raise e
         return snbt_obj
 
+    def file_to_source(
+        self, file_path: str, text: str | None = None
+    ) -> tuple[SNBT, tuple[str, list]]:
+        # patch mode: the tree plus the source text and spans it came from,
+        # read without newline translation so that the text is kept as is
+        if text is None:
+            with open(file_path, "r", encoding="utf-8", newline="") as src:
+                text = src.read()
+        try:
+            snbt_obj, spans = self.get_parser().parse_spans(text, file_path)
+        except Exception as e:
+            self.error(f"Failed to parse SNBT file '{file_path}': {e}.")
+            raise e
+        return snbt_obj, (text, spans)
+
     def snbt_to_file(self, snbt_obj: SNBT, file_path: str) -> None:
-        with open(file_path, "w", encoding="utf-8") as dst:
-            snbt_obj.pretty_file(dst)
-            dst.write("\n")
+        self.str_to_file(self.snbt_to_str(snbt_obj), file_path)
+
+    def snbt_to_str(
+        self, snbt_obj: SNBT, source: tuple[str, list] | None = None
+    ) -> str:
+        if source is not None:
+            text, spans = source
+            return self.writer.splice(text, spans)
+        return self.writer.dumps(snbt_obj) + "\n"
+
+    def str_to_file(self, text: str, file_path: str) -> int:
+        # patch output keeps the line endings of its source
+        newline = "" if self.output_format == "patch" else None
+        return self.output.write_text(file_path, text, newline)
 
     def update_out_langs(
         self, str_or_key: str, file_name: str, new_key: str
     ) -> None:
         if not str_or_key:
             return
+        self.strings_replaced += 1
         if str_or_key[0] == "{" and str_or_key[-1] == "}":
             # looks like a key
             key = str_or_key[1:-1]
-            if key in self.in_langs[self.default_lang]:
-                value = self.in_langs[self.default_lang][key]
-            else:
+            value = self.in_langs.get(self.default_lang, key)
+            if value is None:
                 # not found, warn and serve as raw text
                 self.warn(
                     f"Localization key '{key}' in file '{file_name}' not found in '{self.default_lang}.json' lang file. Serving as raw text."
                 )
                 value = str_or_key
-            # insert into out_langs
-            for lang_code in self.out_langs:
-                if key in self.in_langs[lang_code]:
-                    self.out_langs[lang_code][new_key] = self.in_langs[
-                        lang_code
-                    ][key]
-                else:
-                    self.out_langs[lang_code][new_key] = value
+            # insert into out_langs, every language at once: its own
+            # translation of key, or the default language's value
+            self.out_langs.set_row(new_key, self.in_langs.resolve(key, value))
         else:
             # raw text
-            value = str_or_key
-            for lang_code in self.out_langs:
-                self.out_langs[lang_code][new_key] = value
+            self.out_langs.fill(new_key, str_or_key)
@@ -1,9 +1,13 @@
 from .lang_tree_node import LangTreeNode
 from .lang_tree import LangTree
 from .lang_forest import LangForest
+from .lang_store import LangStore
+from .lang_writer import LangWriter
 
 __all__ = [
     "LangTreeNode",
     "LangTree",
     "LangForest",
+    "LangStore",
+    "LangWriter",
 ]
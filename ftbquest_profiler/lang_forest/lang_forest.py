@@ -1,4 +1,5 @@
 from .lang_tree import LangTree
+from .lang_writer import LangWriter
 import os
 
 
@@ -30,8 +31,11 @@ class LangForest:
         lang_dir: str,
         namespace: str | None = "ftbquests",
         sort: bool = True,
+        jobs: int = 1,
     ) -> None:
         if not os.path.exists(lang_dir):
             os.makedirs(lang_dir)
-        for tree in self.trees.values():
-            tree.to_lang_file(lang_dir, namespace, sort)
+        LangWriter(jobs=jobs).write_many(
+            (tree.lang_file_path(lang_dir), tree.lang_entries(namespace, sort))
+            for tree in self.trees.values()
+        )
@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Callable, Iterable
+
+
+# lang entries of several languages at once: one shared key table, and per
+# key one row holding the value of every language (None where missing),
+# ordered like lang_codes; a language's column is read by its index
+#
+# rows may be shared between keys and stores, so a key that resolves to the
+# same values as another costs one reference, and setting a key costs the
+# same for 1 or 30 languages; rows filled by set_column are lists, every
+# other row is a tuple and never changed in place
+class LangStore:
+    def __init__(self, lang_codes: Iterable[str]) -> None:
+        self.lang_codes: list[str] = list(lang_codes)
+        self.lang_index: dict[str, int] = {
+            lang_code: i for i, lang_code in enumerate(self.lang_codes)
+        }
+        self.key_index: dict[str, int] = dict()
+        self.keys: list[str] = []
+        self.rows: list[tuple[str | None, ...] | list[str | None]] = []
+        # key -> (fallback, row) cache of resolve()
+        self.resolved: dict[str, tuple[str, tuple[str, ...]]] = dict()
+
+    @classmethod
+    def from_dicts(cls, langs: dict[str, dict[str, str]]) -> LangStore:
+        store = cls(langs)
+        for lang_code, entries in langs.items():
+            store.set_column(lang_code, entries)
+        return store
+
+    def set_column(self, lang_code: str, entries: dict[str, str]) -> None:
+        # one language's values, e.g. a whole lang file
+        i = self.lang_index[lang_code]
+        width = len(self.lang_codes)
+        key_index = self.key_index
+        keys = self.keys
+        rows = self.rows
+        for key, value in entries.items():
+            index = key_index.get(key)
+            if index is None:
+                key_index[key] = len(keys)
+                keys.append(key)
+                row = [None] * width
+                rows.append(row)
+            else:
+                row = rows[index]
+                if type(row) is tuple:
+                    row = rows[index] = list(row)
+            row[i] = value
+        self.resolved.clear()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_index
+
+    def row(self, key: str) -> tuple[str | None, ...] | list[str | None] | None:
+        index = self.key_index.get(key)
+        if index is None:
+            return None
+        return self.rows[index]
+
+    def get(self, lang_code: str, key: str) -> str | None:
+        index = self.key_index.get(key)
+        if index is None:
+            return None
+        return self.rows[index][self.lang_index[lang_code]]
+
+    def set_row(self, key: str, row: tuple[str | None, ...]) -> None:
+        # an existing key keeps its position, like a dict
+        index = self.key_index.get(key)
+        if index is None:
+            self.key_index[key] = len(self.keys)
+            self.keys.append(key)
+            self.rows.append(row)
+        else:
+            self.rows[index] = row
+
+    def fill(self, key: str, value: str) -> None:
+        # the same value for every language
+        self.set_row(key, (value,) * len(self.lang_codes))
+
+    def resolve(self, key: str, fallback: str) -> tuple[str, ...]:
+        # the values of key in every language, fallback where one lacks it
+        cached = self.resolved.get(key)
+        if cached is not None and cached[0] == fallback:
+            return cached[1]
+        row = self.row(key)
+        if row is None:
+            resolved = (fallback,) * len(self.lang_codes)
+        elif None in row:
+            resolved = tuple(fallback if value is None else value for value in row)
+        else:
+            resolved = tuple(row)
+        self.resolved[key] = (fallback, resolved)
+        return resolved
+
+    def update(self, other: LangStore) -> None:
+        if other.lang_codes != self.lang_codes:
+            other = other.reorder(self.lang_codes)
+        if not self.keys:
+            self.key_index = dict(other.key_index)
+            self.keys = list(other.keys)
+            self.rows = list(other.rows)
+            return
+        key_index = self.key_index
+        keys = self.keys
+        rows = self.rows
+        for key, row in zip(other.keys, other.rows):
+            index = key_index.get(key)
+            if index is None:
+                key_index[key] = len(keys)
+                keys.append(key)
+                rows.append(row)
+            else:
+                rows[index] = row
+
+    def reorder(self, lang_codes: list[str]) -> LangStore:
+        # the same entries with columns in the given order, missing as None
+        store = LangStore(lang_codes)
+        indices = [self.lang_index.get(lang_code) for lang_code in lang_codes]
+        for key, row in zip(self.keys, self.rows):
+            store.set_row(
+                key, tuple(None if i is None else row[i] for i in indices)
+            )
+        return store
+
+    def split(self, part_of: Callable[[str], str]) -> dict[str, LangStore]:
+        # the entries grouped by part_of(key), rows shared with this store
+        parts: dict[str, LangStore] = dict()
+        for key, row in zip(self.keys, self.rows):
+            name = part_of(key)
+            part = parts.get(name)
+            if part is None:
+                part = parts[name] = LangStore(self.lang_codes)
+            part.key_index[key] = len(part.keys)
+            part.keys.append(key)
+            part.rows.append(row)
+        return parts
+
+    def clusters(self) -> list[list[str]]:
+        # keys holding the same value in every language, groups of two or
+        # more in the order of their first key; rows are hashed as tuples
+        index: dict[tuple[str | None, ...], list[str]] = dict()
+        for key, row in zip(self.keys, self.rows):
+            index.setdefault(tuple(row), []).append(key)
+        return [keys for keys in index.values() if len(keys) > 1]
+
+    def rename(self, names: dict[str, str]) -> LangStore:
+        # the same entries with keys renamed by names; keys renamed to the
+        # same name become one entry at the position of the first of them
+        store = LangStore(self.lang_codes)
+        for key, row in zip(self.keys, self.rows):
+            key = names.get(key, key)
+            if key not in store.key_index:
+                store.set_row(key, row)
+        return store
+
+    def column(self, lang_code: str) -> list[str | None]:
+        # the values of one language, ordered like keys
+        i = self.lang_index[lang_code]
+        return [row[i] for row in self.rows]
+
+    def items(self, lang_code: str) -> list[tuple[str, str]]:
+        # (key, value) of one language in insertion order
+        return [
+            (key, value)
+            for key, value in zip(self.keys, self.column(lang_code))
+            if value is not None
+        ]
+
+    def to_dict(self, lang_code: str) -> dict[str, str]:
+        column = self.column(lang_code)
+        if None not in column:
+            return dict(zip(self.keys, column))
+        return {
+            key: value for key, value in zip(self.keys, column) if value is not None
+        }
+
+    def to_json(self) -> dict:
+        return {
+            "lang_codes": self.lang_codes,
+            "keys": self.keys,
+            "rows": self.rows,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict, lang_codes: list[str]) -> LangStore:
+        store = cls(data["lang_codes"])
+        for key, row in zip(data["keys"], data["rows"]):
+            store.set_row(key, tuple(row))
+        if store.lang_codes != lang_codes:
+            store = store.reorder(lang_codes)
+        return store
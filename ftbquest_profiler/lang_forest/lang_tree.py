@@ -1,4 +1,6 @@
 from .lang_tree_node import LangTreeNode
+from .lang_writer import LangWriter
+from typing import Iterable, Iterator
 import os
 import json
 
@@ -10,7 +12,7 @@ class LangTree:
         if not lang_code:
             raise ValueError("lang_code cannot be empty")
         self.lang_code = lang_code
-        self.root = LangTreeNode(children={})
+        self.root = LangTreeNode()
 
     def insert(self, key: str, value: str) -> None:
         if not isinstance(key, str):
@@ -19,11 +21,29 @@ class LangTree:
             raise TypeError("value must be a string")
         self.root.get_node(key, create=True).value = value
 
+    def insert_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        # same as insert per entry, unchecked, for keys sorted or grouped by
+        # parent like the ones of a lang file
+        self.root.insert_many(entries)
+
     def at(self, key: str) -> str | None:
         return self.root.get_node(key).value
 
     def contains(self, key: str) -> bool:
-        self.root.contains(key)
+        return self.root.contains(key)
+
+    def items(
+        self, prefix: str = "", sort: bool = True
+    ) -> Iterator[tuple[str, str]]:
+        # (key, value) of every entry at and below prefix, "" for all
+        return self.root.walk_prefix(prefix, sort=sort)
+
+    def delete(self, key: str) -> LangTreeNode:
+        # removes key together with every key below it
+        try:
+            return self.root.delete(key)
+        except KeyError as e:
+            raise KeyError(f"Key '{key}' not found in LangTree") from e
 
     def from_lang_file(
         self, lang_dir: str, namespace: str | None = "ftbquests"
@@ -40,10 +60,15 @@ class LangTree:
                 raise ValueError(
                     f"Value for key '{key}' in language file {file_path} is not a string"
                 )
-            if not namespace:
-                self.insert(key, value)
-            elif key.startswith(f"{namespace}."):
-                self.insert(key[len(namespace) + 1 :], value)
+        if not namespace:
+            self.root.insert_many(lang_data.items())
+        else:
+            prefix = f"{namespace}."
+            self.root.insert_many(
+                (key[len(prefix) :], value)
+                for key, value in lang_data.items()
+                if key.startswith(prefix)
+            )
 
     def to_lang_file(
         self,
@@ -53,28 +78,21 @@ class LangTree:
     ) -> None:
         if not os.path.exists(lang_dir):
             os.makedirs(lang_dir)
-        file_path = os.path.join(lang_dir, f"{self.lang_code}.json")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write("{\n")
-            for key, value in self.root.walk(sort=sort):
-                if namespace:
-                    full_key = f"{namespace}.{key}"
-                else:
-                    full_key = key
-                value_escaped = value.translate(
-                    str.maketrans(
-                        {
-                            '"': r"\"",
-                            "\n": r"\n",
-                            "\r": r"\r",
-                            "\t": r"\t",
-                        }
-                    )
-                )
-                f.write(f'  "{full_key}": "{value_escaped}",\n')
-            # remove the last comma
-            f.seek(f.tell() - 3)
-            f.write("\n}\n")
+        LangWriter().write(
+            self.lang_file_path(lang_dir), self.lang_entries(namespace, sort)
+        )
+
+    def lang_file_path(self, lang_dir: str) -> str:
+        return os.path.join(lang_dir, f"{self.lang_code}.json")
+
+    def lang_entries(
+        self, namespace: str | None = "ftbquests", sort: bool = True
+    ) -> Iterator[tuple[str, str]]:
+        # sorted by segment, the order of the tree, not of the full keys
+        if not namespace:
+            return self.root.walk(sort=sort)
+        prefix = f"{namespace}."
+        return ((prefix + key, value) for key, value in self.root.walk(sort=sort))
 
     def get_lang_code(self) -> str:
         return self.lang_code
@@ -1,7 +1,17 @@
 from __future__ import annotations
+from typing import Iterable, Iterator
+import sys
 
 
+# one segment of a dotted lang key like "ftbquests.chapterxxx.questxxxx.title";
+# children is None until the first child is added, segments are interned as
+# the same few names ("title", "subtitle", ...) repeat under every quest
+#
+# every operation walks the key segment by segment in a loop, so the depth of
+# a key is not limited by the recursion limit
 class LangTreeNode:
+    __slots__ = ("value", "children")
+
     def __init__(
         self,
         value: str | None = None,
@@ -11,70 +21,111 @@ class LangTreeNode:
         self.children = children
 
     def get_node(self, key_path: str, create: bool = False) -> LangTreeNode:
-        if key_path.find(".") != -1:
-            # allow nested access using dot notation like "ftbquests.chapterxxx.questxxxx.title"
-            parts = key_path.split(".", 1)
-            first_part = parts[0]
-            rest_part = parts[1]
+        node = self
+        for part in key_path.split("."):
+            children = node.children
             if create:
-                child_node = self.children.setdefault(
-                    first_part, LangTreeNode(children={})
-                )
-                return child_node.get_node(rest_part, create=True)
-            else:
-                child_node = self.children.get(first_part)
-                if not child_node:
-                    raise KeyError(
-                        f"Key '{first_part}' does not refer to a LangTreeNode, but None"
-                    )
-                return child_node.get_node(rest_part, create=False)
-        else:
-            if create:
-                return self.children.setdefault(
-                    key_path, LangTreeNode(children={})
-                )
+                if children is None:
+                    children = node.children = dict()
+                child_node = children.get(part)
+                if child_node is None:
+                    child_node = children[sys.intern(part)] = LangTreeNode()
             else:
-                child_node = self.children.get(key_path)
-                if not child_node:
+                child_node = None if children is None else children.get(part)
+                if child_node is None:
                     raise KeyError(
-                        f"Key '{key_path}' does not refer to a LangTreeNode, but None"
+                        f"Key '{part}' does not refer to a LangTreeNode, but None"
                     )
-                return child_node
+            node = child_node
+        return node
 
     def set_node(self, key_path: str, value: LangTreeNode) -> None:
-        if key_path.find(".") != -1:
-            # allow nested access using dot notation like "ftbquests.chapterxxx.questxxxx.title"
-            parts = key_path.split(".", 1)
-            first_part = parts[0]
-            rest_part = parts[1]
-            child_node = self.children.setdefault(
-                first_part, LangTreeNode(children={})
-            )
-            child_node.set_node(rest_part, value)
-        else:
-            self.children[key_path] = value
+        node = self
+        if "." in key_path:
+            head, _, key_path = key_path.rpartition(".")
+            node = self.get_node(head, create=True)
+        if node.children is None:
+            node.children = dict()
+        node.children[sys.intern(key_path)] = value
 
     def contains(self, key_path: str) -> bool:
-        if key_path.find(".") != -1:
-            parts = key_path.split(".", 1)
-            first_part = parts[0]
-            rest_part = parts[1]
-            if first_part not in self.children:
+        node = self
+        for part in key_path.split("."):
+            if node.children is None:
                 return False
-            child_node = self.children[first_part]
-            return child_node.contains(rest_part)
-        else:
-            return key_path in self.children
+            node = node.children.get(part)
+            if node is None:
+                return False
+        return True
+
+    def insert_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        # consecutive keys mostly share their parent, e.g. the lines of one
+        # quest description, so the last parent is looked up only once
+        last_head = None
+        last_parent = self
+        for key_path, value in entries:
+            head, dot, last = key_path.rpartition(".")
+            if not dot:
+                parent = self
+            elif head == last_head:
+                parent = last_parent
+            else:
+                parent = last_parent = self.get_node(head, create=True)
+                last_head = head
+            parent.get_node(last, create=True).value = value
+
+    def delete(self, key_path: str) -> LangTreeNode:
+        # removes the node with its whole subtree, and parents left without
+        # value and children
+        path = []
+        node = self
+        for part in key_path.split("."):
+            child_node = None if node.children is None else node.children.get(part)
+            if child_node is None:
+                raise KeyError(
+                    f"Key '{part}' does not refer to a LangTreeNode, but None"
+                )
+            path.append((node, part))
+            node = child_node
+        removed = node
+        for parent, part in reversed(path):
+            del parent.children[part]
+            if parent.children:
+                break
+            parent.children = None
+            if parent.value or parent is self:
+                break
+        return removed
+
+    def walk(
+        self, prefix: str = "", sort: bool = True
+    ) -> Iterator[tuple[str, str]]:
+        # pre-order, children in sorted or insertion order
+        stack = [(prefix, self)]
+        while stack:
+            prefix, node = stack.pop()
+            if node.value:
+                yield prefix, node.value
+            children = node.children
+            if not children:
+                continue
+            if sort:
+                keys = sorted(children, reverse=True)
+            else:
+                keys = reversed(children)
+            if prefix:
+                prefix += "."
+            for key in keys:
+                stack.append((prefix + key, children[key]))
 
-    def walk(self, prefix: str = "", sort: bool = True):
-        if self.value:
-            yield prefix, self.value
-        if sort:
-            for key in sorted(self.children.keys()):
-                value = self.children[key]
-                full_key = f"{prefix}.{key}" if prefix else key
-                yield from value.walk(full_key, sort=True)
-        else:
-            for key, value in self.children.items():
-                full_key = f"{prefix}.{key}" if prefix else key
-                yield from value.walk(full_key, sort=False)
+    def walk_prefix(
+        self, prefix: str, sort: bool = True
+    ) -> Iterator[tuple[str, str]]:
+        # the entries at and below prefix, with their full keys
+        if not prefix:
+            return self.walk(sort=sort)
+        try:
+            node = self.get_node(prefix)
+        except KeyError:
+            return iter(())
+        return node.walk(prefix, sort=sort)
@@ -0,0 +1,73 @@
+from io import StringIO
+from itertools import islice
+from json.encoder import encode_basestring
+from typing import Callable, Iterable, TextIO
+
+
+# writes Minecraft lang files, byte for byte what json.dump(ensure_ascii=False,
+# indent=2, sort_keys=sort) writes, from (key, value) pairs as they come:
+# entries are escaped by the json module's C encoder and written in chunks
+# of chunk_size entries, no dict of the whole language is needed
+#
+# write_many writes several files on up to jobs threads, which mostly
+# overlaps their file I/O
+#
+# with output given, a file is rendered to a string and handed to
+# output(file_path, text) instead of being written, see FileOutput
+class LangWriter:
+    def __init__(
+        self,
+        sort: bool = False,
+        jobs: int = 1,
+        chunk_size: int = 4096,
+        output: Callable[[str, str], object] | None = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.sort = sort
+        self.jobs = max(jobs, 1)
+        self.chunk_size = chunk_size
+        self.output = output
+
+    def write(self, file_path: str, entries: Iterable[tuple[str, str]]) -> None:
+        if self.output is not None:
+            self.output(file_path, self.dumps(entries))
+            return
+        with open(file_path, "w", encoding="utf-8") as f:
+            self.dump(entries, f)
+
+    def dumps(self, entries: Iterable[tuple[str, str]]) -> str:
+        f = StringIO()
+        self.dump(entries, f)
+        return f.getvalue()
+
+    def dump(self, entries: Iterable[tuple[str, str]], f: TextIO) -> None:
+        if self.sort:
+            entries = sorted(entries)
+        encode = encode_basestring
+        entries = iter(entries)
+        separator = "{\n  "
+        while True:
+            chunk = [
+                f"{encode(key)}: {encode(value)}"
+                for key, value in islice(entries, self.chunk_size)
+            ]
+            if not chunk:
+                break
+            f.write(separator + ",\n  ".join(chunk))
+            separator = ",\n  "
+        f.write("{}" if separator == "{\n  " else "\n}")
+
+    def write_many(
+        self, files: Iterable[tuple[str, Iterable[tuple[str, str]]]]
+    ) -> None:
+        files = list(files)
+        if self.jobs == 1 or len(files) < 2:
+            for file_path, entries in files:
+                self.write(file_path, entries)
+            return
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(files))) as pool:
+            # list() raises the first error of any file
+            list(pool.map(lambda file: self.write(*file), files))
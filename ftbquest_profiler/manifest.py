@@ -0,0 +1,78 @@
+import json
+from .lang_forest import LangStore
+
+# bump whenever the profiler output for the same input changes
+MANIFEST_VERSION = 2
+
+
+def file_hash(file_path: str) -> str:
+    import hashlib
+
+    with open(file_path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+# what the previous run saw and produced, stored in the output directory:
+# the profiler config, hashes of the input lang files and, per input file,
+# its hash, whether it was written and the lang entries it produced, in the
+# columnar form of LangStore.to_json
+class Manifest:
+    def __init__(self, config: dict, langs: dict[str, str]) -> None:
+        self.config = config
+        self.langs = langs
+        self.lang_codes: list[str] = []
+        # entries of the previous run, usable only if config and langs match
+        self.files: dict[str, dict] = dict()
+        # entries of this run
+        self.next_files: dict[str, dict] = dict()
+
+    @classmethod
+    def load(cls, file_path: str, config: dict, langs: dict[str, str]):
+        manifest = cls(config, langs)
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if (
+            isinstance(data, dict)
+            and data.get("version") == MANIFEST_VERSION
+            and data.get("config") == config
+            and data.get("langs") == langs
+        ):
+            manifest.files = data.get("files", dict())
+            manifest.lang_codes = data.get("lang_codes", [])
+        return manifest
+
+    def save(self, file_path: str) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "config": self.config,
+            "langs": self.langs,
+            "lang_codes": self.lang_codes,
+            "files": self.next_files,
+        }
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def lookup(self, rel_path: str, hash: str) -> dict | None:
+        entry = self.files.get(rel_path)
+        if entry is None or entry["hash"] != hash:
+            return None
+        return entry
+
+    def keep(self, rel_path: str, entry: dict) -> None:
+        self.next_files[rel_path] = entry
+
+    def record(
+        self,
+        rel_path: str,
+        hash: str,
+        written: bool,
+        fragment: LangStore,
+    ) -> None:
+        self.next_files[rel_path] = {
+            "hash": hash,
+            "written": written,
+            "langs": fragment.to_json(),
+        }
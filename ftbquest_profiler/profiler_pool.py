@@ -0,0 +1,27 @@
+# process pool workers of FTBQuestProfiler
+#
+# every worker receives a pickled copy of the profiler once (see
+# FTBQuestProfiler.__getstate__), then parses, transforms and serializes
+# whole files, sending back the output text, the lang entries found and,
+# with a run report requested, the file's timings and counters
+from contextlib import redirect_stdout
+from io import StringIO
+from .lang_forest import LangStore
+
+profiler = None
+
+
+def init_worker(parent) -> None:
+    global profiler
+    profiler = parent
+
+
+def process_file(
+    dir_name: str, file_name: str, handler: str
+) -> tuple[str | None, LangStore, dict | None, str]:
+    # log messages are captured and printed by the parent in file order
+    with redirect_stdout(StringIO()) as output:
+        text, fragment, stats = profiler.process_file(
+            dir_name, file_name, handler
+        )
+    return text, fragment, stats, output.getvalue()
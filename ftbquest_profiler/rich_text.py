@@ -0,0 +1,116 @@
+from collections import OrderedDict
+import json
+import re
+
+# kinds of quest description lines
+PLAIN = "plain"
+KEY = "key"
+IMAGE = "image"
+PAGEBREAK = "pagebreak"
+JSON = "json"
+
+# json.loads ignores exactly these around a document
+JSON_WHITESPACE = " \t\n\r"
+JSON_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+JSON_CONSTANTS = frozenset(
+    ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+)
+
+# stands for a line that looked like JSON but did not parse
+NOT_JSON = object()
+
+
+def may_be_json(line: str) -> bool:
+    # False for every line json.loads would reject by its first bytes,
+    # so plain text never pays a failed parse and its exception
+    stripped = line.strip(JSON_WHITESPACE)
+    if not stripped:
+        return False
+    first = stripped[0]
+    if first in '{["':
+        return True
+    if first in "-0123456789":
+        return (
+            JSON_NUMBER.fullmatch(stripped) is not None
+            or stripped == "-Infinity"
+        )
+    return stripped in JSON_CONSTANTS
+
+
+def classify_text(line: str) -> str:
+    # a non-empty line that is not JSON: "{key}" refers to a lang entry,
+    # "{image:...}" and "{@pagebreak}" are FTBQuests markup
+    if line == "{@pagebreak}":
+        return PAGEBREAK
+    if line[0] == "{" and line[-1] == "}":
+        if line[1:-1].strip().startswith("image:"):
+            return IMAGE
+        return KEY
+    return PLAIN
+
+
+def copy_component(component):
+    # the profiler only replaces "text" and "translate" of the top-level
+    # object, or of the top-level array's elements, and inserts into that
+    # array; copying these levels keeps a cached component intact
+    if isinstance(component, dict):
+        return dict(component)
+    if isinstance(component, list):
+        return [
+            dict(elem) if isinstance(elem, dict) else elem for elem in component
+        ]
+    return component
+
+
+# parsed JSON text components of description lines, keyed by the raw line;
+# the same rich-text line is often repeated across quests, e.g. a colored
+# "Rewards:" header, and is then parsed only once
+#
+# bounded to size lines, the least recently used one is evicted first;
+# size 0 disables caching, lines are still classified
+class RichTextCache:
+    def __init__(self, size: int = 4096) -> None:
+        if size < 0:
+            raise ValueError("size cannot be negative")
+        self.size = size
+        self.cache: OrderedDict[str, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # lines told apart as plain text without parsing
+        self.skipped = 0
+
+    def classify(self, line: str) -> tuple[str, object]:
+        # (kind, parsed component) of a non-empty line, the component is a
+        # fresh copy the caller may change, None unless kind is JSON
+        if not may_be_json(line):
+            self.skipped += 1
+            return classify_text(line), None
+        component = self.parse(line)
+        if component is NOT_JSON:
+            return classify_text(line), None
+        return JSON, copy_component(component)
+
+    def parse(self, line: str) -> object:
+        if self.size == 0:
+            self.misses += 1
+            return self.loads(line)
+        cache = self.cache
+        component = cache.get(line, cache)
+        if component is not cache:
+            self.hits += 1
+            cache.move_to_end(line)
+            return component
+        self.misses += 1
+        component = cache[line] = self.loads(line)
+        if len(cache) > self.size:
+            cache.popitem(last=False)
+        return component
+
+    def loads(self, line: str) -> object:
+        try:
+            return json.loads(line)
+        except Exception:
+            return NOT_JSON
+
+    def counters(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.skipped
@@ -0,0 +1,177 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+import json
+import os
+import time
+from .snbt import SNBT, SNBTList, SNBTArray
+
+if TYPE_CHECKING:
+    import cProfile
+
+# counters summed over all files in the report totals
+FILE_COUNTERS = (
+    "bytes_read",
+    "tokens",
+    "nodes",
+    "strings_replaced",
+    "lang_keys",
+    "bytes_written",
+    "rich_text_hits",
+    "rich_text_misses",
+    "plain_text_lines",
+    "parse_cache_hits",
+)
+
+
+def tree_counts(snbt_obj: SNBT) -> tuple[int, int]:
+    # (tokens, nodes) of a parsed tree, derived from its shape instead of
+    # counting in the lexer: a compound is { } plus key : value per entry,
+    # a list [ ] plus its elements, an array [ X ; ] plus its elements
+    tokens = 0
+    nodes = 0
+    stack = [snbt_obj]
+    while stack:
+        value = stack.pop()
+        nodes += 1
+        if isinstance(value, SNBT):
+            tokens += 2 + 2 * len(value)
+            stack.extend(value.values())
+        elif isinstance(value, SNBTList):
+            if value.values is not None:
+                # numbers only, counted without walking them
+                tokens += 2 + len(value)
+                nodes += len(value)
+            else:
+                tokens += 2
+                stack.extend(value)
+        elif isinstance(value, SNBTArray):
+            tokens += 4 + len(value)
+            nodes += len(value)
+        else:
+            tokens += 1
+    return tokens, nodes
+
+
+# timings and counters of one input file, taken wherever it is processed
+class FileTimer:
+    def __init__(self, file_path: str) -> None:
+        self.stats: dict = {"bytes_read": os.path.getsize(file_path)}
+        self.cpu = time.process_time()
+        self.clock = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stats[f"{name}_s"] = now - self.clock
+        self.clock = now
+
+    def count(self, snbt_obj: SNBT) -> None:
+        # not part of any lap
+        self.stats["tokens"], self.stats["nodes"] = tree_counts(snbt_obj)
+        self.clock = time.perf_counter()
+
+    def done(self, **counters) -> dict:
+        self.stats.update(counters)
+        self.stats["cpu_s"] = time.process_time() - self.cpu
+        return self.stats
+
+
+# wall and CPU time per stage, timings and counters per file, and optionally
+# a cProfile capture of one profiler run
+class RunReport:
+    def __init__(self, config: dict, cprofile: bool = False) -> None:
+        from datetime import datetime, timezone
+
+        self.config = config
+        self.started = datetime.now(timezone.utc)
+        self.stages: dict[str, dict] = dict()
+        self.files: dict[str, dict] = dict()
+        # further top-level entries, e.g. the duplicate lang clusters
+        self.sections: dict[str, object] = dict()
+        self.profile: cProfile.Profile | None = None
+        if cprofile:
+            # cProfile and pstats are only loaded when asked for
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.cpu = time.process_time()
+        self.clock = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        cpu = time.process_time()
+        clock = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(
+                name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0}
+            )
+            stage["wall_s"] += time.perf_counter() - clock
+            stage["cpu_s"] += time.process_time() - cpu
+            stage["calls"] += 1
+
+    def add_file(self, rel_path: str, stats: dict) -> None:
+        self.files[rel_path] = stats
+
+    def add_section(self, name: str, data: object) -> None:
+        self.sections[name] = data
+
+    def save(self, file_path: str) -> None:
+        wall = time.perf_counter() - self.clock
+        cpu = time.process_time() - self.cpu
+        if self.profile is not None:
+            self.profile.disable()
+
+        totals = {"files": len(self.files), "cached_files": 0}
+        totals.update((name, 0) for name in FILE_COUNTERS)
+        for stats in self.files.values():
+            if stats.get("cached"):
+                totals["cached_files"] += 1
+            for name in FILE_COUNTERS:
+                totals[name] += stats.get(name, 0)
+        # of the JSON description lines, how many were parsed before
+        parsed = totals["rich_text_hits"] + totals["rich_text_misses"]
+        totals["rich_text_hit_rate"] = (
+            totals["rich_text_hits"] / parsed if parsed else 0.0
+        )
+
+        report = {
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_s": wall,
+            # of this process, per-file cpu_s is taken in the worker
+            "cpu_s": cpu,
+            "config": self.config,
+            "stages": self.stages,
+            "totals": totals,
+            "files": self.files,
+        }
+        report.update(self.sections)
+        if self.profile is not None:
+            stats_path = os.path.splitext(file_path)[0] + ".pstats"
+            self.profile.dump_stats(stats_path)
+            report["cprofile"] = {
+                "stats_file": stats_path,
+                "top": self.top_functions(),
+            }
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    def top_functions(self, limit: int = 30) -> list[dict]:
+        import pstats
+
+        stats = pstats.Stats(self.profile).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{file_name}:{line}({name})",
+                "calls": calls,
+                "tottime_s": tottime,
+                "cumtime_s": cumtime,
+            }
+            for (file_name, line, name), (_, calls, tottime, cumtime, _) in rows[
+                :limit
+            ]
+        ]
@@ -0,0 +1,63 @@
+from fnmatch import fnmatchcase
+from typing import Callable
+
+
+# a list of include or exclude patterns: "chapter:<id>" and "quest:<id>"
+# match the chapter file with that chapter id or holding that quest, any
+# other pattern is a glob against the path relative to the FTBQuests
+# directory (chapters/xxx.snbt), or the bare file name if it has no "/"
+class Patterns:
+    def __init__(self, patterns: list[str]) -> None:
+        self.globs: list[str] = []
+        self.chapter_ids: set[str] = set()
+        self.quest_ids: set[str] = set()
+        for pattern in patterns:
+            kind, _, value = pattern.partition(":")
+            if kind in ("chapter", "quest") and value:
+                ids = self.chapter_ids if kind == "chapter" else self.quest_ids
+                ids.add(value)
+            elif kind in ("chapter", "quest"):
+                raise ValueError(f"Pattern '{pattern}' has no id.")
+            else:
+                self.globs.append(pattern)
+
+    def __bool__(self) -> bool:
+        return bool(self.globs or self.chapter_ids or self.quest_ids)
+
+    def matches(
+        self, rel_path: str, ids: Callable[[], tuple[str | None, set[str]]]
+    ) -> bool:
+        file_name = rel_path.rsplit("/", 1)[-1]
+        for glob in self.globs:
+            if fnmatchcase(rel_path if "/" in glob else file_name, glob):
+                return True
+        if (self.chapter_ids or self.quest_ids) and rel_path.startswith(
+            "chapters/"
+        ):
+            chapter_id, quest_ids = ids()
+            return chapter_id in self.chapter_ids or not self.quest_ids.isdisjoint(
+                quest_ids
+            )
+        return False
+
+
+# which input files a run processes: those matching an include pattern, or
+# every file if there is none, unless they match an exclude pattern
+#
+# ids is called for a chapter file only when chapter or quest ids are to be
+# matched, and returns its chapter id and quest ids; wanted holds every id
+# of both lists, a chapter whose text contains none of them needs no parsing
+class Selection:
+    def __init__(self, include: list[str], exclude: list[str]) -> None:
+        self.include = Patterns(include)
+        self.exclude = Patterns(exclude)
+        self.wanted: set[str] = set()
+        for patterns in (self.include, self.exclude):
+            self.wanted |= patterns.chapter_ids | patterns.quest_ids
+
+    def selects(
+        self, rel_path: str, ids: Callable[[], tuple[str | None, set[str]]]
+    ) -> bool:
+        if self.include and not self.include.matches(rel_path, ids):
+            return False
+        return not self.exclude.matches(rel_path, ids)
@@ -1,3 +1,12 @@
 from .snbt import SNBT, SNBTList, SNBTArray
+from .snbt_writer import SNBTWriter
+from .nbt import NBTReader, NBTWriter
 
-__all__ = ["SNBT", "SNBTList", "SNBTArray"]
+__all__ = [
+    "SNBT",
+    "SNBTList",
+    "SNBTArray",
+    "SNBTWriter",
+    "NBTReader",
+    "NBTWriter",
+]
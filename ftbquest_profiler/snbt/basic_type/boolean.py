@@ -1,9 +1,19 @@
-from typing import Literal
+from typing import Literal, Self
 
 
+# immutable, there are only two instances: Boolean(True) and Boolean(False),
+# shared by every tree; value is set once below and cannot be reassigned
 class Boolean:
-    def __init__(self, value) -> None:
-        self.value = bool(value)
+    __slots__ = ("value",)
+
+    def __new__(cls, value) -> Self:
+        return TRUE if value else FALSE
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("Boolean is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Boolean is immutable")
 
     def __bool__(self) -> bool:
         return self.value
@@ -18,3 +28,16 @@ class Boolean:
         if isinstance(other, Boolean):
             return self.value == other.value
         return False
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __reduce__(self):
+        # unpickle into the singletons
+        return (Boolean, (self.value,))
+
+
+TRUE = object.__new__(Boolean)
+object.__setattr__(TRUE, "value", True)
+FALSE = object.__new__(Boolean)
+object.__setattr__(FALSE, "value", False)
@@ -1,10 +1,12 @@
 # floating point types
 class FloatingPoint(float):
-    pass
+    __slots__ = ()
 
 
 # single precision floating point
 class Float(FloatingPoint):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"{float(self)}f"
 
@@ -14,6 +16,8 @@ class Float(FloatingPoint):
 
 # double precision floating point
 class Double(FloatingPoint):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return f"{float(self)}d"
 
@@ -3,12 +3,24 @@ from typing import Self
 
 # integer wrapper classes
 class Number(int):
-    pass
+    __slots__ = ()
+
+
+# shared instances of common small values, filled below each class;
+# numbers are immutable, so handing out the same object is safe
+BYTE_CACHE: dict[int, "Byte"] = dict()
+INT_CACHE: dict[int, "Int"] = dict()
 
 
 # byte integer (-128 to 127)
 class Byte(Number):
+    __slots__ = ()
+
     def __new__(cls, value) -> Self:
+        if cls is Byte:
+            cached = BYTE_CACHE.get(value)
+            if cached is not None:
+                return cached
         if not (-128 <= value <= 127):
             raise ValueError("Byte value must be between -128 and 127")
         return super().__new__(cls, value)
@@ -20,8 +32,13 @@ class Byte(Number):
         return f"{int(self)}b"
 
 
+BYTE_CACHE.update((value, Byte(value)) for value in range(-128, 128))
+
+
 # short integer (-32,768 to 32,767)
 class Short(Number):
+    __slots__ = ()
+
     def __new__(cls, value) -> Self:
         if not (-32768 <= value <= 32767):
             raise ValueError("Short value must be between -32,768 and 32,767")
@@ -36,7 +53,13 @@ class Short(Number):
 
 # integer (-2,147,483,648 to 2,147,483,647)
 class Int(Number):
+    __slots__ = ()
+
     def __new__(cls, value) -> Self:
+        if cls is Int:
+            cached = INT_CACHE.get(value)
+            if cached is not None:
+                return cached
         if not (-2147483648 <= value <= 2147483647):
             raise ValueError(
                 "Int value must be between -2,147,483,648 and 2,147,483,647"
@@ -50,8 +73,14 @@ class Int(Number):
         return f"{int(self)}"
 
 
+# counts, coordinates, order indices
+INT_CACHE.update((value, Int(value)) for value in range(-256, 1025))
+
+
 # long integer (-9,223,372,036,854,775,808 to 9,223,372,036,854,775,807)
 class Long(Number):
+    __slots__ = ()
+
     def __new__(cls, value) -> Self:
         if not (-9223372036854775808 <= value <= 9223372036854775807):
             raise ValueError(
@@ -1,4 +1,6 @@
 class String(str):
+    __slots__ = ()
+
     def __str__(self) -> str:
         escaped = (
             super()
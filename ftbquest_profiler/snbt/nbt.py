@@ -0,0 +1,415 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import BinaryIO, Callable
+import re
+import struct
+from .snbt import SNBT, SNBTList, SNBTArray, SNBTValue, PACK_MIN, packed_list
+from .basic_type import *
+
+# tag ids of the binary format, Java Edition (big-endian)
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+# one byte per tag id, as written in front of compound entries
+TAG_BYTES = [bytes((tag_id,)) for tag_id in range(TAG_LONG_ARRAY + 1)]
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# NBT has no boolean, Minecraft stores one as a byte; a Boolean is written
+# as TAG_Byte 1 or 0 and read back as Byte
+VALUE_TAGS: dict[type, int] = {
+    Byte: TAG_BYTE,
+    Boolean: TAG_BYTE,
+    Short: TAG_SHORT,
+    Int: TAG_INT,
+    Long: TAG_LONG,
+    Float: TAG_FLOAT,
+    Double: TAG_DOUBLE,
+    String: TAG_STRING,
+    SNBTList: TAG_LIST,
+    SNBT: TAG_COMPOUND,
+}
+# struct format and class of every numeric tag
+NUMERIC_TAGS: dict[int, tuple[str, type]] = {
+    TAG_BYTE: ("b", Byte),
+    TAG_SHORT: ("h", Short),
+    TAG_INT: ("i", Int),
+    TAG_LONG: ("q", Long),
+    TAG_FLOAT: ("f", Float),
+    TAG_DOUBLE: ("d", Double),
+}
+# struct format and SNBTArray typecode of every array tag
+ARRAY_TAGS: dict[int, tuple[str, str]] = {
+    TAG_BYTE_ARRAY: ("b", "b"),
+    TAG_INT_ARRAY: ("i", "i"),
+    TAG_LONG_ARRAY: ("q", "l"),
+}
+TYPECODE_TAGS = {
+    typecode: tag_id for tag_id, (_, typecode) in ARRAY_TAGS.items()
+}
+
+U16 = struct.Struct(">H")
+I32 = struct.Struct(">i")
+F32 = struct.Struct(">f")
+FLOAT32_MIN_NORMAL = 2.0**-126
+# tag id and name length in front of every compound entry
+ENTRY_HEADER = struct.Struct(">bH")
+# element tag id and length of a list
+LIST_HEADER = struct.Struct(">bi")
+
+SUPPLEMENTARY = re.compile("[\U00010000-\U0010ffff]")
+
+
+def split_surrogates(match: re.Match) -> str:
+    code = ord(match.group()) - 0x10000
+    return chr(0xD800 + (code >> 10)) + chr(0xDC00 + (code & 0x3FF))
+
+
+def float32_value(value: float) -> float:
+    # -0.0 and 0.0 are equal, one key of the cache below would give both
+    # the sign of the first one read
+    if not value:
+        return value
+    return shortest_float32(value)
+
+
+@lru_cache(maxsize=4096)
+def shortest_float32(value: float) -> float:
+    # a float32 widened to a double prints with noise digits (0.1f reads
+    # back as 0.10000000149011612); the shortest decimal that rounds to the
+    # same float32 prints as the text it came from, 9 digits always do
+    #
+    # a normal float32 lies closer to any decimal of up to 6 digits rounding
+    # to it than half a unit of the 6th digit, so ".6g" (which drops
+    # trailing zeros) finds those, and a longer one is needed only if it
+    # fails; subnormals have fewer bits and are tried from 1 digit
+    packed = F32.pack(value)
+    start = 6 if abs(value) >= FLOAT32_MIN_NORMAL else 1
+    for digits in range(start, 10):
+        shortest = float(f"{value:.{digits}g}")
+        if F32.pack(shortest) == packed:
+            return shortest
+    return value
+
+
+def encode_mutf8(value: str) -> bytes:
+    # Java's modified UTF-8: NUL as C0 80 and characters outside the BMP
+    # as two 3-byte surrogates, plain UTF-8 otherwise
+    if value.isascii():
+        data = value.encode("ascii")
+    else:
+        if SUPPLEMENTARY.search(value) is not None:
+            value = SUPPLEMENTARY.sub(split_surrogates, value)
+        data = value.encode("utf-8", "surrogatepass")
+    if b"\x00" in data:
+        data = data.replace(b"\x00", b"\xc0\x80")
+    return data
+
+
+def decode_mutf8(data: bytes) -> str:
+    # C0 80 and encoded surrogates are invalid UTF-8, so text without them,
+    # nearly all of it, takes the fast path
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    value = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+    # joins surrogate pairs, lone surrogates are kept
+    return value.encode("utf-16-le", "surrogatepass").decode(
+        "utf-16-le", "surrogatepass"
+    )
+
+
+# reads binary NBT, gzip-compressed or not, into SNBT objects; numeric lists
+# and arrays are unpacked with one struct call each, and compound names,
+# which repeat throughout a file, are decoded once per reader
+class NBTReader:
+    def __init__(self) -> None:
+        self.names: dict[bytes, str] = dict()
+        self.readers: list[Callable[[bytes, int], tuple[SNBTValue, int]]] = [
+            self.read_end,
+            *(
+                self.numeric_reader(tag_id)
+                for tag_id in range(TAG_BYTE, TAG_BYTE_ARRAY)
+            ),
+            self.array_reader(TAG_BYTE_ARRAY),
+            self.read_string,
+            self.read_list,
+            self.read_compound,
+            self.array_reader(TAG_INT_ARRAY),
+            self.array_reader(TAG_LONG_ARRAY),
+        ]
+
+    def loads(self, data: bytes) -> SNBT:
+        return self.loads_named(data)[1]
+
+    def loads_named(self, data: bytes) -> tuple[str, SNBT]:
+        # (root name, root compound)
+        if data[:2] == GZIP_MAGIC:
+            import gzip
+
+            data = gzip.decompress(data)
+        data = bytes(data)
+        try:
+            tag_id, length = ENTRY_HEADER.unpack_from(data, 0)
+            if tag_id != TAG_COMPOUND:
+                raise ValueError(
+                    f"NBT data starts with tag {tag_id}, not a compound."
+                )
+            name = decode_mutf8(data[3 : 3 + length])
+            compound, pos = self.read_compound(data, 3 + length)
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"Truncated or malformed NBT data: {e}.") from e
+        if pos != len(data):
+            raise ValueError(
+                f"{len(data) - pos} bytes of trailing data after the NBT root."
+            )
+        return name, compound
+
+    def load(self, file: BinaryIO) -> SNBT:
+        # a gzip stream is decompressed as it is read
+        return self.loads(file.read())
+
+    def read_file(self, file_path: str) -> SNBT:
+        with open(file_path, "rb") as f:
+            if f.peek(2)[:2] == GZIP_MAGIC:
+                import gzip
+
+                with gzip.GzipFile(fileobj=f) as gz:
+                    return self.load(gz)
+            return self.load(f)
+
+    def read_end(self, data: bytes, pos: int) -> tuple[SNBTValue, int]:
+        raise ValueError(f"Unexpected end tag at byte {pos}.")
+
+    def numeric_reader(self, tag_id: int):
+        fmt, cls = NUMERIC_TAGS[tag_id]
+        unpack = struct.Struct(">" + fmt).unpack_from
+        size = struct.calcsize(fmt)
+
+        def read(data: bytes, pos: int) -> tuple[SNBTValue, int]:
+            return cls(unpack(data, pos)[0]), pos + size
+
+        def read_float(data: bytes, pos: int) -> tuple[SNBTValue, int]:
+            return cls(float32_value(unpack(data, pos)[0])), pos + size
+
+        return read_float if tag_id == TAG_FLOAT else read
+
+    def array_reader(self, tag_id: int):
+        fmt, typecode = ARRAY_TAGS[tag_id]
+        size = struct.calcsize(fmt)
+
+        def read(data: bytes, pos: int) -> tuple[SNBTValue, int]:
+            (length,) = I32.unpack_from(data, pos)
+            pos += 4
+            end = pos + length * size
+            if end > len(data):
+                raise ValueError(f"Array of {length} elements overruns the data.")
+            if fmt == "b":
+                # bytes initialize a signed byte array as they are
+                return SNBTArray(typecode, data[pos:end]), end
+            values = struct.unpack_from(f">{length}{fmt}", data, pos)
+            return SNBTArray(typecode, values), end
+
+        return read
+
+    def read_string(self, data: bytes, pos: int) -> tuple[SNBTValue, int]:
+        (length,) = U16.unpack_from(data, pos)
+        end = pos + 2 + length
+        if end > len(data):
+            raise ValueError(f"String of {length} bytes overruns the data.")
+        return String(decode_mutf8(data[pos + 2 : end])), end
+
+    def read_list(self, data: bytes, pos: int) -> tuple[SNBTValue, int]:
+        tag_id, length = LIST_HEADER.unpack_from(data, pos)
+        pos += 5
+        if length <= 0:
+            return SNBTList(), pos
+        numeric = NUMERIC_TAGS.get(tag_id)
+        if numeric is not None:
+            fmt, cls = numeric
+            values = struct.unpack_from(f">{length}{fmt}", data, pos)
+            end = pos + length * struct.calcsize(fmt)
+            if tag_id == TAG_FLOAT:
+                values = map(float32_value, values)
+            if length >= PACK_MIN:
+                return packed_list(cls, values), end
+            return SNBTList(map(cls, values)), end
+        read = self.readers[tag_id]
+        items = SNBTList()
+        append = items.append
+        for _ in range(length):
+            item, pos = read(data, pos)
+            append(item)
+        return items, pos
+
+    def read_compound(self, data: bytes, pos: int) -> tuple[SNBTValue, int]:
+        compound = SNBT()
+        names = self.names
+        readers = self.readers
+        while True:
+            tag_id = data[pos]
+            if tag_id == TAG_END:
+                return compound, pos + 1
+            (length,) = U16.unpack_from(data, pos + 1)
+            pos += 3
+            raw_name = data[pos : pos + length]
+            name = names.get(raw_name)
+            if name is None:
+                name = names[raw_name] = decode_mutf8(raw_name)
+            compound[name], pos = readers[tag_id](data, pos + length)
+
+
+# writes SNBT objects as binary NBT, optionally gzip-compressed; the output
+# is built from a list of byte chunks, numeric lists and arrays are packed
+# with one struct call each
+#
+# compresslevel is gzip's, 6 compresses nearly as well as the default 9 at
+# a fraction of the time
+class NBTWriter:
+    def __init__(self, compresslevel: int = 6) -> None:
+        self.compresslevel = compresslevel
+        # name -> encoded length and name of a compound entry
+        self.names: dict[str, bytes] = dict()
+        self.writers: dict[int, Callable[[SNBTValue, list[bytes]], None]] = {
+            TAG_STRING: self.write_string,
+            TAG_LIST: self.write_list,
+            TAG_COMPOUND: self.write_compound,
+        }
+        for tag_id in NUMERIC_TAGS:
+            self.writers[tag_id] = self.numeric_writer(tag_id)
+        for tag_id in ARRAY_TAGS:
+            self.writers[tag_id] = self.array_writer(tag_id)
+
+    def dumps(self, value: SNBT, name: str = "") -> bytes:
+        out: list[bytes] = []
+        self.write_root(value, name, out)
+        return b"".join(out)
+
+    def dump(self, value: SNBT, file: BinaryIO, name: str = "") -> None:
+        # file may be a gzip.GzipFile; one write, every write to it costs
+        file.write(self.dumps(value, name))
+
+    def write_file(
+        self, value: SNBT, file_path: str, compressed: bool = True, name: str = ""
+    ) -> None:
+        # gzip-compressed, like Minecraft's .dat files, unless told otherwise
+        if compressed:
+            import gzip
+
+            with gzip.open(file_path, "wb", self.compresslevel) as f:
+                self.dump(value, f, name)
+        else:
+            with open(file_path, "wb") as f:
+                self.dump(value, f, name)
+
+    def write_root(self, value: SNBT, name: str, out: list[bytes]) -> None:
+        if not isinstance(value, SNBT):
+            raise TypeError("The NBT root must be an SNBT compound.")
+        out.append(bytes((TAG_COMPOUND,)))
+        self.write_name(name, out)
+        self.write_compound(value, out)
+
+    def tag_of(self, value: SNBTValue) -> int:
+        tag_id = VALUE_TAGS.get(type(value))
+        if tag_id is not None:
+            return tag_id
+        if isinstance(value, SNBTArray):
+            tag_id = TYPECODE_TAGS.get(value.typecode)
+            if tag_id is not None:
+                return tag_id
+        for cls, tag_id in VALUE_TAGS.items():
+            if isinstance(value, cls):
+                return tag_id
+        raise TypeError(f"Cannot write {type(value).__name__} as NBT.")
+
+    def write_name(self, name: str, out: list[bytes]) -> None:
+        data = encode_mutf8(name)
+        if len(data) > 0xFFFF:
+            raise ValueError("NBT names are limited to 65535 bytes.")
+        out.append(U16.pack(len(data)))
+        out.append(data)
+
+    def numeric_writer(self, tag_id: int):
+        pack = struct.Struct(">" + NUMERIC_TAGS[tag_id][0]).pack
+
+        def write(value: SNBTValue, out: list[bytes]) -> None:
+            if isinstance(value, Boolean):
+                value = 1 if value else 0
+            out.append(pack(value))
+
+        return write
+
+    def array_writer(self, tag_id: int):
+        fmt = ARRAY_TAGS[tag_id][0]
+
+        def write(value: SNBTValue, out: list[bytes]) -> None:
+            out.append(struct.pack(f">i{len(value)}{fmt}", len(value), *value))
+
+        return write
+
+    def write_string(self, value: SNBTValue, out: list[bytes]) -> None:
+        data = encode_mutf8(value)
+        if len(data) > 0xFFFF:
+            raise ValueError("NBT strings are limited to 65535 bytes.")
+        out.append(U16.pack(len(data)))
+        out.append(data)
+
+    def write_list(self, value: SNBTValue, out: list[bytes]) -> None:
+        if not value:
+            out.append(LIST_HEADER.pack(TAG_END, 0))
+            return
+        if value.values is not None:
+            # one type by construction, packed without boxing
+            tag_id = VALUE_TAGS[value.tag]
+            fmt = NUMERIC_TAGS[tag_id][0]
+            out.append(LIST_HEADER.pack(tag_id, len(value)))
+            out.append(struct.pack(f">{len(value)}{fmt}", *value.values))
+            return
+        tag_of = self.tag_of
+        tag_id = tag_of(value[0])
+        for item in value:
+            if tag_of(item) != tag_id:
+                raise ValueError(
+                    f"NBT lists hold one type, cannot write {item!r} in a list of tag {tag_id}."
+                )
+        out.append(LIST_HEADER.pack(tag_id, len(value)))
+        numeric = NUMERIC_TAGS.get(tag_id)
+        if numeric is not None:
+            if tag_id == TAG_BYTE:
+                value = [
+                    (1 if item else 0) if isinstance(item, Boolean) else item
+                    for item in value
+                ]
+            out.append(struct.pack(f">{len(value)}{numeric[0]}", *value))
+            return
+        write = self.writers[tag_id]
+        for item in value:
+            write(item, out)
+
+    def write_compound(self, value: SNBTValue, out: list[bytes]) -> None:
+        names = self.names
+        writers = self.writers
+        tag_of = self.tag_of
+        for key, item in value.items():
+            tag_id = tag_of(item)
+            name = names.get(key)
+            if name is None:
+                data = encode_mutf8(key)
+                if len(data) > 0xFFFF:
+                    raise ValueError("NBT names are limited to 65535 bytes.")
+                name = names[key] = U16.pack(len(data)) + data
+            out.append(TAG_BYTES[tag_id])
+            out.append(name)
+            writers[tag_id](item, out)
+        out.append(TAG_BYTES[TAG_END])
@@ -71,7 +71,22 @@ class SNBTArray(arr.array):
         stream.write(sep_end + indent_str + "]")
 
 
+# a list of numbers of one type (its tag, e.g. Int) is packed: it also
+# holds them unboxed in values, an array as SNBTArray stores [I; ...], which
+# the writers and the NBT codec read instead of the elements; the elements
+# stay in the list, so it is a list to any code, and a change through a list
+# method drops the array (see pack_list)
 class SNBTList(list[SNBTValue]):
+    # set on packed lists only
+    tag: type | None = None
+    values: arr.array | None = None
+
+    def __reduce_ex__(self, protocol):
+        # a packed list is pickled as its array
+        if self.values is None:
+            return super().__reduce_ex__(protocol)
+        return packed_list, (self.tag, self.values)
+
     def pretty_str(
         self,
         seps: tuple[str, str, str] = ("\n", "\n", "\n"),
@@ -149,6 +164,76 @@ class SNBTList(list[SNBTValue]):
         stream.write(sep_end + indent_str + "]")
 
 
+# array typecode of every number type a list can be packed as; Float keeps
+# "d", its values are Python floats and would be rounded by "f"
+PACKED_TYPECODES: dict[type, str] = {
+    Byte: "b",
+    Short: "h",
+    Int: "i",
+    Long: "q",
+    Float: "d",
+    Double: "d",
+}
+# below this many elements the writers gain nothing from the array
+PACK_MIN = 16
+
+
+def pack_list(items: SNBTList) -> SNBTList:
+    # items, packed if they are numbers of one type
+    if len(items) < PACK_MIN:
+        return items
+    tag = type(items[0])
+    typecode = PACKED_TYPECODES.get(tag)
+    if typecode is None:
+        return items
+    for item in items:
+        if type(item) is not tag:
+            return items
+    items.tag = tag
+    items.values = arr.array(typecode, items)
+    return items
+
+
+def packed_list(tag: type, values) -> SNBTList:
+    # a packed SNBTList of the numbers values, boxed into tag
+    values = arr.array(PACKED_TYPECODES[tag], values)
+    items = SNBTList(map(tag, values))
+    items.tag = tag
+    items.values = values
+    return items
+
+
+def unpacking(name: str):
+    # a list method changing the elements, which leaves them unpacked
+    method = getattr(list, name)
+
+    def change(self, *args, **kwargs):
+        if self.values is not None:
+            self.tag = self.values = None
+        return method(self, *args, **kwargs)
+
+    change.__name__ = name
+    return change
+
+
+for name in (
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "__setitem__",
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+):
+    setattr(SNBTList, name, unpacking(name))
+del name
+
+
 class SNBT(dict[str, SNBTValue]):
     def pretty_str(
         self,
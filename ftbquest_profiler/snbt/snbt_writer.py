@@ -0,0 +1,316 @@
+from __future__ import annotations
+from io import FileIO
+import re
+from .snbt import SNBT, SNBTList, SNBTArray, SNBTValue
+from .basic_type import *
+
+DEFAULT_SEPS = ("\n", "\n", "\n")
+INLINE_SEPS = (" ", ", ", " ")
+
+# characters String.__str__ has to escape
+NEEDS_ESCAPE = re.compile(r"[\\\"\n\t\r]")
+# keys the lexer reads back as an ID token
+PLAIN_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# the indentation of a line that has more than whitespace
+INDENTED_LINE = re.compile(r"\n([ \t]+)\S")
+
+
+def format_string(value: String) -> str:
+    if NEEDS_ESCAPE.search(value) is None:
+        return '"' + value + '"'
+    return str(value)
+
+
+SCALAR_FORMATTERS = {
+    String: format_string,
+    Int: int.__repr__,
+    Double: lambda value: float.__repr__(value) + "d",
+    Float: lambda value: float.__repr__(value) + "f",
+    Byte: lambda value: int.__repr__(value) + "b",
+    Short: lambda value: int.__repr__(value) + "s",
+    Long: lambda value: int.__repr__(value) + "L",
+}
+
+
+# serializes SNBT into one string built from a list of chunks;
+# the default mode is byte-identical to SNBT.pretty, the compact mode puts
+# everything on a single line for machine consumption, and splice() keeps
+# the formatting of a parsed source, re-rendering only replaced values
+class SNBTWriter:
+    def __init__(self, indent: str = "\t", compact: bool = False) -> None:
+        self.indent = indent
+        self.compact = compact
+        # key -> rendered key, the compact mode quotes and separates keys
+        # differently and has its own
+        self.key_cache: dict[str, str] = dict()
+        self.compact_key_cache: dict[str, str] = dict()
+        self.indent_cache: dict[tuple[str, int], str] = dict()
+
+    def dumps(
+        self,
+        value: SNBTValue,
+        seps: tuple[str, str, str] = DEFAULT_SEPS,
+        indent_level: int = 0,
+    ) -> str:
+        if self.compact:
+            return self.compact_str(value)
+        out: list[str] = []
+        self.write(value, out, seps, self.indent, indent_level)
+        return "".join(out)
+
+    def dump(
+        self,
+        value: SNBTValue,
+        file: FileIO,
+        seps: tuple[str, str, str] = DEFAULT_SEPS,
+        indent_level: int = 0,
+    ) -> None:
+        file.write(self.dumps(value, seps, indent_level))
+
+    def splice(self, text: str, spans: list) -> str:
+        # copies the source text, re-rendering only the values that were
+        # replaced since parsing; spans come from SNBTParser.parse_spans
+        out: list[str] = []
+        pos = 0
+        newline = "\r\n" if "\r\n" in text else "\n"
+        for container, key, value, start, end in spans:
+            if start < pos:
+                # inside a value already re-rendered
+                continue
+            current = container[key]
+            if current is value or current == value:
+                continue
+            # a replaced value continues the indentation and line endings
+            # of its line
+            line_start = text.rfind("\n", 0, start) + 1
+            line = text[line_start:start]
+            lead = line[: len(line) - len(line.lstrip())]
+            rendered: list[str] = []
+            self.write(
+                current,
+                rendered,
+                DEFAULT_SEPS,
+                self.source_indent(text, start, end, lead),
+                0,
+            )
+            out.append(text[pos:start])
+            out.append("".join(rendered).replace("\n", newline + lead))
+            pos = end
+        if not out:
+            return text
+        out.append(text[pos:])
+        return "".join(out)
+
+    def source_indent(self, text: str, start: int, end: int, lead: str) -> str:
+        # the indent unit of the source, so that a source indented with
+        # spaces gets no tabs: what the replaced value indented its own
+        # elements by, else the indentation of the first indented line
+        match = INDENTED_LINE.search(text, start, end)
+        if match is not None:
+            inner = match.group(1)
+            if len(inner) > len(lead) and inner.startswith(lead):
+                return inner[len(lead) :]
+        match = INDENTED_LINE.search(text)
+        if match is not None:
+            return match.group(1)
+        return self.indent
+
+    def indent_str(self, indent: str, indent_level: int) -> str:
+        cache_key = (indent, indent_level)
+        indent_str = self.indent_cache.get(cache_key)
+        if indent_str is None:
+            indent_str = self.indent_cache[cache_key] = indent * indent_level
+        return indent_str
+
+    def key_str(self, key: str) -> str:
+        key_str = self.key_cache.get(key)
+        if key_str is None:
+            if ":" in key or "." in key:
+                key_str = f'"{key}": '
+            else:
+                key_str = f"{key}: "
+            self.key_cache[key] = key_str
+        return key_str
+
+    def write(
+        self,
+        value: SNBTValue,
+        out: list[str],
+        seps: tuple[str, str, str],
+        indent: str,
+        indent_level: int,
+    ) -> None:
+        if isinstance(value, SNBT):
+            self.write_compound(value, out, seps, indent, indent_level)
+        elif isinstance(value, SNBTList):
+            self.write_list(value, out, seps, indent, indent_level)
+        elif isinstance(value, SNBTArray):
+            self.write_array(value, out, seps, indent, indent_level)
+        else:
+            out.append(SCALAR_FORMATTERS.get(type(value), str)(value))
+
+    def write_compound(
+        self,
+        value: SNBT,
+        out: list[str],
+        seps: tuple[str, str, str],
+        indent: str,
+        indent_level: int,
+    ) -> None:
+        if not value:
+            out.append("{ }")
+            return
+
+        sep_start, sep_mid, sep_end = seps
+        inner_indent_str = self.indent_str(indent, indent_level + 1)
+        first = sep_start + inner_indent_str
+        mid = sep_mid + inner_indent_str
+        formatters = SCALAR_FORMATTERS
+        key_cache = self.key_cache
+
+        out.append("{")
+        prefix = first
+        for key, item in value.items():
+            key_str = key_cache.get(key)
+            if key_str is None:
+                key_str = self.key_str(key)
+            out.append(prefix + key_str)
+            prefix = mid
+
+            if isinstance(item, SNBT):
+                if key == "item" and not "tag" in item:
+                    self.write_compound(item, out, INLINE_SEPS, "", 0)
+                else:
+                    self.write_compound(
+                        item, out, seps, indent, indent_level + 1
+                    )
+            elif isinstance(item, SNBTList):
+                if indent_level == 0 and (
+                    key == "chapter_groups" or key == "rewards"
+                ):
+                    out.append("[")
+                    for j, element in enumerate(item):
+                        out.append(first + indent if j == 0 else mid + indent)
+                        assert isinstance(element, SNBT)
+                        self.write_compound(element, out, INLINE_SEPS, "", 0)
+                    out.append(sep_end + inner_indent_str + "]")
+                else:
+                    self.write_list(item, out, seps, indent, indent_level + 1)
+            elif isinstance(item, SNBTArray):
+                self.write_array(item, out, seps, indent, indent_level + 1)
+            else:
+                out.append(formatters.get(type(item), str)(item))
+        out.append(sep_end + self.indent_str(indent, indent_level) + "}")
+
+    def write_list(
+        self,
+        value: SNBTList,
+        out: list[str],
+        seps: tuple[str, str, str],
+        indent: str,
+        indent_level: int,
+    ) -> None:
+        if not value:
+            out.append("[ ]")
+            return
+
+        formatters = SCALAR_FORMATTERS
+        if value.values is not None:
+            # the tag's formatter takes the unboxed numbers as they are
+            self.write_packed(value, out, seps, indent, indent_level)
+            return
+        if len(value) == 1:
+            item = value[0]
+            if isinstance(item, (SNBT, SNBTList, SNBTArray)):
+                out.append("[")
+                self.write(item, out, seps, indent, indent_level)
+                out.append("]")
+            else:
+                out.append("[" + formatters.get(type(item), str)(item) + "]")
+            return
+
+        sep_start, sep_mid, sep_end = seps
+        inner_indent_str = self.indent_str(indent, indent_level + 1)
+        mid = sep_mid + inner_indent_str
+
+        out.append("[" + sep_start + inner_indent_str)
+        for i, item in enumerate(value):
+            if i:
+                out.append(mid)
+            if isinstance(item, (SNBT, SNBTList, SNBTArray)):
+                self.write(item, out, seps, indent, indent_level + 1)
+            else:
+                out.append(formatters.get(type(item), str)(item))
+        out.append(sep_end + self.indent_str(indent, indent_level) + "]")
+
+    def write_packed(
+        self,
+        value: SNBTList,
+        out: list[str],
+        seps: tuple[str, str, str],
+        indent: str,
+        indent_level: int,
+    ) -> None:
+        items = map(SCALAR_FORMATTERS[value.tag], value.values)
+        if len(value) == 1:
+            out.append("[" + next(items) + "]")
+            return
+        sep_start, sep_mid, sep_end = seps
+        inner_indent_str = self.indent_str(indent, indent_level + 1)
+        out.append("[" + sep_start + inner_indent_str)
+        out.append((sep_mid + inner_indent_str).join(items))
+        out.append(sep_end + self.indent_str(indent, indent_level) + "]")
+
+    def write_array(
+        self,
+        value: SNBTArray,
+        out: list[str],
+        seps: tuple[str, str, str],
+        indent: str,
+        indent_level: int,
+    ) -> None:
+        type_str = value.typecode.capitalize()
+        if not value:
+            out.append(f"[{type_str}; ]")
+            return
+
+        sep_start, sep_mid, sep_end = seps
+        inner_indent_str = self.indent_str(indent, indent_level + 1)
+        # array items are plain ints, one join covers all of them
+        out.append(f"[{type_str};" + sep_start + inner_indent_str)
+        out.append((sep_mid + inner_indent_str).join(map(str, value)))
+        out.append(sep_end + self.indent_str(indent, indent_level) + "]")
+
+    def compact_key_str(self, key: str) -> str:
+        key_str = self.compact_key_cache.get(key)
+        if key_str is None:
+            if PLAIN_KEY.fullmatch(key) and key not in (
+                "true",
+                "false",
+                "B",
+                "I",
+                "L",
+            ):
+                key_str = key + ":"
+            else:
+                key_str = str(String(key)) + ":"
+            self.compact_key_cache[key] = key_str
+        return key_str
+
+    def compact_str(self, value: SNBTValue) -> str:
+        if isinstance(value, SNBT):
+            return (
+                "{"
+                + ",".join(
+                    self.compact_key_str(key) + self.compact_str(item)
+                    for key, item in value.items()
+                )
+                + "}"
+            )
+        if isinstance(value, SNBTList):
+            if value.values is not None:
+                return "[" + ",".join(map(SCALAR_FORMATTERS[value.tag], value.values)) + "]"
+            return "[" + ",".join(map(self.compact_str, value)) + "]"
+        if isinstance(value, SNBTArray):
+            return f"[{value.typecode.capitalize()};" + ",".join(map(str, value)) + "]"
+        return SCALAR_FORMATTERS.get(type(value), str)(value)
@@ -1,4 +1,7 @@
 from .snbt_lexer import SNBTLexer
+from .snbt_scanner import SNBTScanner
+from .snbt_descent_parser import SNBTDescentParser
 from .snbt_parser import SNBTParser
+from .parse_cache import ParseCache
 
-__all__ = ["SNBTLexer", "SNBTParser"]
+__all__ = ["SNBTLexer", "SNBTScanner", "SNBTDescentParser", "SNBTParser", "ParseCache"]
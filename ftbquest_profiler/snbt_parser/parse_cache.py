@@ -0,0 +1,154 @@
+from contextlib import suppress
+from functools import lru_cache
+import os
+import sys
+import threading
+
+# hashlib and pickle are imported where they are used, the parser imports
+# this module and most runs have no parse cache
+
+MB = 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    # a hash of the parser and data model sources: trees cached by other
+    # code, or by another Python, are never read back
+    import hashlib
+    import pickle
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(sys.version.encode("utf-8"))
+    digest.update(str(pickle.HIGHEST_PROTOCOL).encode("utf-8"))
+    for dir_name in ("snbt_parser", "snbt", os.path.join("snbt", "basic_type")):
+        dir_path = os.path.join(package_dir, dir_name)
+        for file_name in sorted(os.listdir(dir_path)):
+            if file_name.endswith(".py"):
+                with open(os.path.join(dir_path, file_name), "rb") as f:
+                    digest.update(file_name.encode("utf-8"))
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+# parsed SNBT trees on disk, keyed by a hash of the parsed text, so that an
+# unchanged file is unpickled instead of lexed and parsed again
+#
+# entries are pickles, which keep the exact types (Boolean, Byte, ...) and
+# the object identity source spans rely on; they live under a directory per
+# code_version(), so a changed parser or basic_type never serves old trees
+#
+# the directory may be shared by several runs and processes at once: an
+# entry is written to a temporary file and moved in place with os.replace,
+# and an entry removed or broken by someone else is a miss; a hit touches
+# the entry's mtime, and once the entries outgrow max_bytes the least
+# recently used ones are removed down to 90% of it
+class ParseCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * MB) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.version_dir = os.path.join(self.cache_dir, code_version())
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # bytes in the cache directory, scanned on the first store
+        self.size: int | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def key(self, text: str, kind: str) -> str:
+        # kind tells apart what is cached for the same text, e.g. a tree
+        # or a tree with spans, and the parser settings that produced it
+        import hashlib
+
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=20)
+        return f"{digest.hexdigest()}-{kind}"
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.version_dir, key[:2], f"{key}.pickle")
+
+    def get(self, key: str) -> object | None:
+        import pickle
+
+        file_path = self.entry_path(key)
+        try:
+            with open(file_path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # cut short or otherwise unreadable, parsed and stored again
+            self.misses += 1
+            with suppress(OSError):
+                os.remove(file_path)
+            return None
+        with suppress(OSError):
+            os.utime(file_path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: object) -> None:
+        import pickle
+
+        file_path = self.entry_path(key)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, file_path)
+        except OSError:
+            # a cache that cannot be written only costs the next parse
+            with suppress(OSError):
+                os.remove(temp_path)
+            return
+        with self.lock:
+            if self.size is None:
+                self.size = sum(size for _, _, size in self.entries())
+            else:
+                self.size += len(data)
+            if self.size > self.max_bytes:
+                self.trim()
+
+    def entries(self) -> list[tuple[float, str, int]]:
+        # (mtime, path, size) of every file under the cache directory, of
+        # any version, so that entries of old versions age out as well
+        entries = []
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, file_path, stat.st_size))
+        return entries
+
+    def trim(self) -> None:
+        entries = sorted(self.entries())
+        size = sum(entry_size for _, _, entry_size in entries)
+        target = self.max_bytes * 9 // 10
+        for _, file_path, entry_size in entries:
+            if size <= target:
+                break
+            with suppress(OSError):
+                os.remove(file_path)
+            size -= entry_size
+        self.size = size
+
+    def clear(self) -> None:
+        for _, file_path, _ in self.entries():
+            with suppress(OSError):
+                os.remove(file_path)
+        self.size = 0
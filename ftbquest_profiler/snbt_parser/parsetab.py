@@ -0,0 +1,62 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'snbtB BOOL BYTE COLON DOUBLE FLOAT I ID INT L LB LC LONG RB RC SEMI SHORT STRINGsnbt : LC snbt_pair_list RC\n        | LC RCsnbt_pair_list   : snbt_pair\n        | snbt_pair_list snbt_pairsnbt_pair : ID COLON snbt_valuesnbt_pair : STRING COLON snbt_valuesnbt_pair : INT COLON snbt_valuesnbt_value  : STRING\n        | BYTE\n        | SHORT\n        | INT\n        | LONG\n        | FLOAT\n        | DOUBLE\n        | BOOL\n        | snbt\n        | snbt_list\n        | snbt_arraysnbt_list : LB snbt_list_elements RB\n        | LB RBsnbt_list_elements   : snbt_value\n        | snbt_list_elements snbt_valuesnbt_array : LB array_type SEMI snbt_array_elements RB\n        | LB array_type SEMI RBarray_type : B\n        | I\n        | Lsnbt_array_elements   : snbt_array_element\n        | snbt_array_elements snbt_array_elementsnbt_array_element : BYTE\n        | INT\n        | LONG'
+    
+_lr_action_items = {'LC':([0,4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[2,-2,-1,2,2,2,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,2,2,-20,-21,-19,-22,-24,-23,]),'$end':([1,4,9,],[0,-2,-1,]),'RC':([2,3,4,5,9,10,14,15,16,17,18,19,20,21,22,23,24,25,27,28,30,36,40,45,],[4,9,-2,-3,-1,-4,-5,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,-6,-7,-20,-19,-24,-23,]),'ID':([2,3,4,5,9,10,14,15,16,17,18,19,20,21,22,23,24,25,27,28,30,36,40,45,],[6,6,-2,-3,-1,-4,-5,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,-6,-7,-20,-19,-24,-23,]),'STRING':([2,3,4,5,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,32,36,37,40,45,],[7,7,-2,-3,-1,-4,15,15,15,-5,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,15,-6,-7,15,-20,-21,-19,-22,-24,-23,]),'INT':([2,3,4,5,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,27,28,29,30,32,36,37,38,39,40,41,42,43,44,45,46,],[8,8,-2,-3,-1,-4,18,18,18,-5,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,18,-6,-7,18,-20,-21,-19,-22,43,43,-24,-28,-30,-31,-32,-23,-29,]),'RB':([4,9,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,38,39,40,41,42,43,44,45,46,],[-2,-1,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,30,36,-20,-21,-19,-22,40,45,-24,-28,-30,-31,-32,-23,-29,]),'BYTE':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,38,39,40,41,42,43,44,45,46,],[-2,-1,16,16,16,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,16,16,-20,-21,-19,-22,42,42,-24,-28,-30,-31,-32,-23,-29,]),'SHORT':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[-2,-1,17,17,17,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,17,17,-20,-21,-19,-22,-24,-23,]),'LONG':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,38,39,40,41,42,43,44,45,46,],[-2,-1,19,19,19,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,19,19,-20,-21,-19,-22,44,44,-24,-28,-30,-31,-32,-23,-29,]),'FLOAT':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[-2,-1,20,20,20,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,20,20,-20,-21,-19,-22,-24,-23,]),'DOUBLE':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[-2,-1,21,21,21,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,21,21,-20,-21,-19,-22,-24,-23,]),'BOOL':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[-2,-1,22,22,22,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,22,22,-20,-21,-19,-22,-24,-23,]),'LB':([4,9,11,12,13,15,16,17,18,19,20,21,22,23,24,25,26,29,30,32,36,37,40,45,],[-2,-1,26,26,26,-8,-9,-10,-11,-12,-13,-14,-15,-16,-17,-18,26,26,-20,-21,-19,-22,-24,-23,]),'COLON':([6,7,8,],[11,12,13,]),'B':([26,],[33,]),'I':([26,],[34,]),'L':([26,],[35,]),'SEMI':([31,33,34,35,],[38,-25,-26,-27,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'snbt':([0,11,12,13,26,29,],[1,23,23,23,23,23,]),'snbt_pair_list':([2,],[3,]),'snbt_pair':([2,3,],[5,10,]),'snbt_value':([11,12,13,26,29,],[14,27,28,32,37,]),'snbt_list':([11,12,13,26,29,],[24,24,24,24,24,]),'snbt_array':([11,12,13,26,29,],[25,25,25,25,25,]),'snbt_list_elements':([26,],[29,]),'array_type':([26,],[31,]),'snbt_array_elements':([38,],[39,]),'snbt_array_element':([38,39,],[41,46,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> snbt","S'",1,None,None,None),
+  ('snbt -> LC snbt_pair_list RC','snbt',3,'p_snbt','snbt_parser.py',84),
+  ('snbt -> LC RC','snbt',2,'p_snbt','snbt_parser.py',85),
+  ('snbt_pair_list -> snbt_pair','snbt_pair_list',1,'p_snbt_pair_list','snbt_parser.py',92),
+  ('snbt_pair_list -> snbt_pair_list snbt_pair','snbt_pair_list',2,'p_snbt_pair_list','snbt_parser.py',93),
+  ('snbt_pair -> ID COLON snbt_value','snbt_pair',3,'p_snbt_pair_id_key','snbt_parser.py',102),
+  ('snbt_pair -> STRING COLON snbt_value','snbt_pair',3,'p_snbt_pair_string_key','snbt_parser.py',106),
+  ('snbt_pair -> INT COLON snbt_value','snbt_pair',3,'p_snbt_pair_num_key','snbt_parser.py',110),
+  ('snbt_value -> STRING','snbt_value',1,'p_snbt_value','snbt_parser.py',115),
+  ('snbt_value -> BYTE','snbt_value',1,'p_snbt_value','snbt_parser.py',116),
+  ('snbt_value -> SHORT','snbt_value',1,'p_snbt_value','snbt_parser.py',117),
+  ('snbt_value -> INT','snbt_value',1,'p_snbt_value','snbt_parser.py',118),
+  ('snbt_value -> LONG','snbt_value',1,'p_snbt_value','snbt_parser.py',119),
+  ('snbt_value -> FLOAT','snbt_value',1,'p_snbt_value','snbt_parser.py',120),
+  ('snbt_value -> DOUBLE','snbt_value',1,'p_snbt_value','snbt_parser.py',121),
+  ('snbt_value -> BOOL','snbt_value',1,'p_snbt_value','snbt_parser.py',122),
+  ('snbt_value -> snbt','snbt_value',1,'p_snbt_value','snbt_parser.py',123),
+  ('snbt_value -> snbt_list','snbt_value',1,'p_snbt_value','snbt_parser.py',124),
+  ('snbt_value -> snbt_array','snbt_value',1,'p_snbt_value','snbt_parser.py',125),
+  ('snbt_list -> LB snbt_list_elements RB','snbt_list',3,'p_snbt_list','snbt_parser.py',129),
+  ('snbt_list -> LB RB','snbt_list',2,'p_snbt_list','snbt_parser.py',130),
+  ('snbt_list_elements -> snbt_value','snbt_list_elements',1,'p_snbt_list_elements','snbt_parser.py',137),
+  ('snbt_list_elements -> snbt_list_elements snbt_value','snbt_list_elements',2,'p_snbt_list_elements','snbt_parser.py',138),
+  ('snbt_array -> LB array_type SEMI snbt_array_elements RB','snbt_array',5,'p_snbt_array','snbt_parser.py',146),
+  ('snbt_array -> LB array_type SEMI RB','snbt_array',4,'p_snbt_array','snbt_parser.py',147),
+  ('array_type -> B','array_type',1,'p_array_type','snbt_parser.py',157),
+  ('array_type -> I','array_type',1,'p_array_type','snbt_parser.py',158),
+  ('array_type -> L','array_type',1,'p_array_type','snbt_parser.py',159),
+  ('snbt_array_elements -> snbt_array_element','snbt_array_elements',1,'p_snbt_array_elements','snbt_parser.py',174),
+  ('snbt_array_elements -> snbt_array_elements snbt_array_element','snbt_array_elements',2,'p_snbt_array_elements','snbt_parser.py',175),
+  ('snbt_array_element -> BYTE','snbt_array_element',1,'p_snbt_array_element','snbt_parser.py',193),
+  ('snbt_array_element -> INT','snbt_array_element',1,'p_snbt_array_element','snbt_parser.py',194),
+  ('snbt_array_element -> LONG','snbt_array_element',1,'p_snbt_array_element','snbt_parser.py',195),
+]
@@ -0,0 +1,158 @@
+from typing import Iterable, NoReturn
+import sys
+from ..snbt import SNBT, SNBTList, SNBTArray
+from ..snbt.snbt import PACK_MIN, pack_list
+from ..snbt.basic_type import String
+
+SCALAR_TOKENS = frozenset(
+    ("STRING", "BYTE", "SHORT", "INT", "LONG", "FLOAT", "DOUBLE", "BOOL")
+)
+ARRAY_ELEMENT_TOKENS = frozenset(("BYTE", "INT", "LONG"))
+ARRAY_BOUNDS = {
+    "B": (-128, 127),
+    "I": (-2147483648, 2147483647),
+    "L": (-9223372036854775808, 9223372036854775807),
+}
+
+
+# builds the SNBT tree straight from (type, value, lineno, lexpos) tokens,
+# accepting the same grammar as the ply.yacc rules in SNBTParser
+#
+# given a spans list and tokens carrying their end offset as well, every
+# string and list value is recorded as [container, key, value, start, end]
+# in source order, see SNBTWriter.splice
+class SNBTDescentParser:
+    def parse(
+        self,
+        tokens: Iterable[tuple],
+        source: str = "string input",
+        spans: list | None = None,
+    ) -> SNBT:
+        self.source = source
+        tokens = iter(tokens)
+        next_token = tokens.__next__
+        try:
+            tok = next_token()
+            if tok[0] != "LC":
+                self.error(tok)
+
+            root = SNBT()
+            container = root
+            is_compound = True
+            stack = []  # enclosing containers
+            pending = None  # first element token of a list just opened
+            open_spans = []  # spans of the enclosing lists
+
+            while True:
+                if is_compound:
+                    tok = next_token()
+                    kind = tok[0]
+                    if kind == "RC":
+                        if not stack:
+                            break
+                        container = stack.pop()
+                        is_compound = type(container) is SNBT
+                        continue
+                    if kind == "ID":
+                        key = tok[1]
+                    elif kind == "STRING":
+                        key = sys.intern(tok[1].raw())
+                    elif kind == "INT":
+                        # wtf, why would someone use a number as a key
+                        key = str(tok[1])
+                    else:
+                        self.error(tok)
+                    tok = next_token()
+                    if tok[0] != "COLON":
+                        self.error(tok)
+                    tok = next_token()
+                else:
+                    if pending is None:
+                        tok = next_token()
+                    else:
+                        tok = pending
+                        pending = None
+                    if tok[0] == "RB":
+                        if len(container) >= PACK_MIN:
+                            pack_list(container)
+                        if spans is not None:
+                            open_spans.pop()[4] = tok[4]
+                        container = stack.pop()
+                        is_compound = type(container) is SNBT
+                        continue
+                    key = None
+
+                kind = tok[0]
+                if kind in SCALAR_TOKENS:
+                    value = tok[1]
+                elif kind == "LC":
+                    value = SNBT()
+                elif kind == "LB":
+                    start = tok[3]
+                    tok = next_token()
+                    kind = tok[0]
+                    if kind == "RB":
+                        value = SNBTList([])
+                    elif kind in ARRAY_BOUNDS:
+                        value = self.parse_array(kind, next_token)
+                    else:
+                        value = SNBTList()
+                        pending = tok
+                else:
+                    self.error(tok)
+
+                if spans is not None:
+                    where = len(container) if key is None else key
+                    if type(value) is SNBTList:
+                        # the end of a non-empty list is filled in at its RB
+                        span = [container, where, value, start, tok[4]]
+                        if pending is not None:
+                            open_spans.append(span)
+                        spans.append(span)
+                    elif type(value) is String:
+                        spans.append([container, where, value, tok[3], tok[4]])
+
+                if key is None:
+                    container.append(value)
+                else:
+                    container[key] = value
+
+                if pending is not None:
+                    stack.append(container)
+                    container = value
+                    is_compound = False
+                elif kind == "LC":
+                    stack.append(container)
+                    container = value
+                    is_compound = True
+        except StopIteration:
+            raise SyntaxError("Syntax error at EOF") from None
+
+        for tok in tokens:
+            self.error(tok)
+        return root
+
+    def parse_array(self, array_type: str, next_token) -> SNBTArray:
+        tok = next_token()
+        if tok[0] != "SEMI":
+            self.error(tok)
+        array_min, array_max = ARRAY_BOUNDS[array_type]
+        elements = []
+        while True:
+            tok = next_token()
+            kind = tok[0]
+            if kind == "RB":
+                return SNBTArray(array_type.lower(), elements)
+            if kind not in ARRAY_ELEMENT_TOKENS:
+                self.error(tok)
+            element = tok[1]
+            if not (array_min <= element <= array_max):
+                raise ValueError(
+                    f"Array element {element} out of bounds for type {array_type}"
+                )
+            elements.append(element)
+
+    def error(self, tok: tuple) -> NoReturn:
+        raise SyntaxError(
+            f"Syntax error at '{tok[1]}' (line {tok[2]}), file {self.source}"
+        )
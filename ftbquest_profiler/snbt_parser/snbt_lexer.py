@@ -1,11 +1,29 @@
 from io import FileIO
-import ply.lex as lex
+import sys
 from ..snbt.basic_type import *
 
 
+def unescape(raw: str) -> str:
+    # strip the quotes and undo the escapes that String.__str__ applies
+    body = raw[1:-1]
+    if "\\" not in body:
+        return body
+    return (
+        body.replace('\\"', '"')
+        .replace("\\'", "'")
+        .replace("\\n", "\n")
+        .replace("\\t", "\t")
+        .replace("\\r", "\r")
+        .replace("\\\\", "\\")
+    )
+
+
 class SNBTLexer:
 
     def __init__(self, **kwargs):
+        # imported here so that the scanner + descent path never loads ply
+        import ply.lex as lex
+
         self.lexer = lex.lex(module=self, **kwargs)
 
     def input(self, data):
@@ -88,21 +106,14 @@ class SNBTLexer:
 
     def t_ID(self, t):
         r"[A-Za-z_][A-Za-z0-9_]*"
+        # keys repeat all over a pack, share one object per name
+        t.value = sys.intern(t.value)
         t.type = self.reserved.get(t.value, "ID")
         return t
 
     def t_STRING(self, t):
         r"(\"([^\\\"]|\\.)*\")|(\'([^\\\']|\\.)*\')"
-        decoded_str = (
-            t.value[1:-1]
-            .replace('\\"', '"')
-            .replace("\\'", "'")
-            .replace("\\n", "\n")
-            .replace("\\t", "\t")
-            .replace("\\r", "\r")
-            .replace("\\\\", "\\")
-        )
-        t.value = String(decoded_str)
+        t.value = String(unescape(t.value))
         return t
 
     def t_newline(self, t):
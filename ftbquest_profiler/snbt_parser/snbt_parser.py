@@ -1,29 +1,132 @@
-from io import FileIO
-import ply.yacc as yacc
+from io import FileIO, StringIO
+import os
+import sys
 from ..snbt import SNBT, SNBTList, SNBTArray
+from ..snbt.snbt import pack_list
 from .snbt_lexer import SNBTLexer
+from .snbt_scanner import SNBTScanner
+from .snbt_descent_parser import SNBTDescentParser
+from .parse_cache import ParseCache
 
 
 class SNBTParser:
     tokens = SNBTLexer.tokens
 
-    def __init__(self, **kwargs) -> None:
-        self.lexer = SNBTLexer()
-        self.parser = yacc.yacc(module=self, **kwargs)
+    # "ply" refills a ply.lex lexer line by line,
+    # "scanner" tokenizes the whole input with one compiled pattern
+    lexers = ("ply", "scanner")
+    # "yacc" drives the LALR tables built by ply.yacc from the p_* rules,
+    # "descent" builds the tree directly from the token stream
+    engines = ("yacc", "descent")
+
+    def __init__(
+        self,
+        lexer: str = "ply",
+        engine: str = "yacc",
+        cache: ParseCache | None = None,
+        **kwargs,
+    ) -> None:
+        if lexer not in self.lexers:
+            raise ValueError(
+                f"Unknown SNBT lexer '{lexer}', expected one of {', '.join(self.lexers)}"
+            )
+        if engine not in self.engines:
+            raise ValueError(
+                f"Unknown SNBT parser engine '{engine}', expected one of {', '.join(self.engines)}"
+            )
+        if lexer == "scanner":
+            self.lexer = SNBTScanner()
+            self.token_source = self.lexer
+        else:
+            self.lexer = SNBTLexer()
+            self.token_source = self.lexer.lexer
+        self.engine = engine
+        # parse_file and parse_spans look trees up here before parsing
+        self.cache = cache
+        self.cache_kind = f"{lexer}-{engine}"
+        if engine == "descent":
+            self.parser = SNBTDescentParser()
+        else:
+            import ply.yacc as yacc
+
+            # load the tables shipped in parsetab.py instead of generating
+            # them, and never write parsetab.py / parser.out anywhere;
+            # after changing the grammar, regenerate the shipped tables with
+            # SNBTParser(write_tables=True)
+            kwargs.setdefault("tabmodule", f"{__package__}.parsetab")
+            kwargs.setdefault("outputdir", os.path.dirname(__file__))
+            kwargs.setdefault("write_tables", False)
+            kwargs.setdefault("debug", False)
+            self.parser = yacc.yacc(module=self, **kwargs)
 
     def parse(self, data) -> SNBT:
         self.from_file = False
         self.lexer.input(data)
-        return self.parser.parse(lexer=self.lexer.lexer)
+        return self.run()
 
     def parse_file(self, file: FileIO) -> SNBT:
+        if self.cache is not None:
+            return self.parse_file_cached(file)
         self.from_file = True
         self.file = file
         self.lexer.input_file(file)
-        return self.parser.parse(lexer=self.lexer.lexer)
+        return self.run()
+
+    def parse_file_cached(self, file: FileIO) -> SNBT:
+        text = file.read()
+        key = self.cache.key(text, self.cache_kind)
+        snbt_obj = self.cache.get(key)
+        if snbt_obj is not None:
+            return snbt_obj
+        src = StringIO(text)
+        # for the error messages
+        src.name = getattr(file, "name", "string input")
+        self.from_file = True
+        self.file = src
+        self.lexer.input_file(src)
+        snbt_obj = self.run()
+        self.cache.put(key, snbt_obj)
+        return snbt_obj
+
+    def parse_spans(
+        self, data: str, source: str = "string input"
+    ) -> tuple[SNBT, list]:
+        # the tree plus the source spans of its strings and lists,
+        # only the whole-input scanner knows offsets into data
+        if not isinstance(self.lexer, SNBTScanner) or self.engine != "descent":
+            raise ValueError(
+                "Source spans need the 'scanner' lexer and the 'descent' engine"
+            )
+        if self.cache is not None:
+            # pickled together, so the spans still point into the tree
+            key = self.cache.key(data, "spans")
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        self.lexer.input(data)
+        spans = []
+        result = self.parser.parse(self.lexer.stream, source, spans), spans
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def run(self) -> SNBT:
+        if self.engine == "yacc":
+            return self.parser.parse(lexer=self.token_source)
+        source = self.file.name if self.from_file else "string input"
+        return self.parser.parse(self.token_tuples(), source)
+
+    def token_tuples(self):
+        if isinstance(self.lexer, SNBTScanner):
+            return self.lexer.stream
+        return (
+            (t.type, t.value, t.lineno, t.lexpos)
+            for t in iter(self.lexer.token, None)
+        )
 
     def restart(self) -> None:
-        self.parser.restart()
+        if self.engine == "yacc":
+            self.parser.restart()
 
     start = "snbt"
 
@@ -51,7 +154,7 @@ class SNBTParser:
 
     def p_snbt_pair_string_key(self, p):
         """snbt_pair : STRING COLON snbt_value"""
-        p[0] = (p[1].raw(), p[3])
+        p[0] = (sys.intern(p[1].raw()), p[3])
 
     def p_snbt_pair_num_key(self, p):
         """snbt_pair : INT COLON snbt_value"""
@@ -76,7 +179,7 @@ class SNBTParser:
         """snbt_list : LB snbt_list_elements RB
         | LB RB"""
         if len(p) == 4:
-            p[0] = p[2]
+            p[0] = pack_list(p[2])
         else:
             p[0] = SNBTList([])
 
@@ -0,0 +1,109 @@
+from io import FileIO
+import re
+import sys
+from ..snbt.basic_type import *
+from .snbt_lexer import SNBTLexer, unescape
+
+
+# a tiny stand-in for ply.lex.LexToken, accepted by ply.yacc
+class SNBTToken:
+    __slots__ = ("type", "value", "lineno", "lexpos", "lexer")
+
+    def __init__(self, type: str, value, lineno: int, lexpos: int) -> None:
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self) -> str:
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+
+# whole-input scanner, producing the same tokens as SNBTLexer
+class SNBTScanner:
+    tokens = SNBTLexer.tokens
+    reserved = SNBTLexer.reserved
+
+    # alternatives follow the rule order of SNBTLexer, whitespace goes first
+    # since no token can start with it, and every other character is an error
+    master = re.compile(
+        r"""
+        (?P<ignore>[ \t\r,\n]+)
+        |(?P<BYTE>-?\d+[bB])
+        |(?P<SHORT>-?\d+[sS])
+        |(?P<LONG>-?\d+[lL])
+        |(?P<FLOAT>-?\d+\.\d+[fF])
+        |(?P<DOUBLE>-?\d+\.\d+[dD])
+        |(?P<INT>-?\d+)
+        |(?P<BOOL>true|false)
+        |(?P<ID>[A-Za-z_][A-Za-z0-9_]*)
+        |(?P<STRING>"[^\\"]*(?:\\.[^\\"]*)*"|'[^\\']*(?:\\.[^\\']*)*')
+        |(?P<LC>\{)
+        |(?P<RC>\})
+        |(?P<LB>\[)
+        |(?P<RB>\])
+        |(?P<COLON>:)
+        |(?P<SEMI>;)
+        |(?P<error>.)
+        """,
+        re.VERBOSE,
+    )
+
+    punctuation = frozenset(("LC", "RC", "LB", "RB", "COLON", "SEMI"))
+    converters = {
+        "BYTE": lambda text: Byte(int(text[:-1])),
+        "SHORT": lambda text: Short(int(text[:-1])),
+        "LONG": lambda text: Long(int(text[:-1])),
+        "FLOAT": lambda text: Float(float(text[:-1])),
+        "DOUBLE": lambda text: Double(float(text[:-1])),
+        "INT": lambda text: Int(int(text)),
+        "BOOL": lambda text: Boolean(text == "true"),
+    }
+
+    def __init__(self) -> None:
+        self.from_file = False
+        self.stream = iter(())
+
+    def input(self, data: str) -> None:
+        self.from_file = False
+        self.stream = self.scan(data)
+
+    def input_file(self, file: FileIO) -> None:
+        self.from_file = True
+        self.file: FileIO = file
+        # one read for the whole file instead of one lexer reset per line
+        self.stream = self.scan(file.read())
+
+    def token(self) -> SNBTToken | None:
+        for type, value, lineno, lexpos, _ in self.stream:
+            return SNBTToken(type, value, lineno, lexpos)
+        return None
+
+    def scan(self, data: str):
+        # yields (type, value, lineno, lexpos, end) tuples, the offsets index
+        # into data and let patch mode splice the source text
+        lineno = 1
+        reserved = self.reserved
+        punctuation = self.punctuation
+        convert = self.converters
+        for m in self.master.finditer(data):
+            kind = m.lastgroup
+            if kind == "ignore":
+                lineno += m.group().count("\n")
+            elif kind == "ID":
+                # keys repeat all over a pack, share one object per name
+                text = sys.intern(m.group())
+                yield reserved.get(text, "ID"), text, lineno, m.start(), m.end()
+            elif kind in punctuation:
+                yield kind, m.group(), lineno, m.start(), m.end()
+            elif kind == "STRING":
+                text = m.group()
+                yield "STRING", String(unescape(text)), lineno, m.start(), m.end()
+                if "\n" in text:
+                    lineno += text.count("\n")
+            elif kind == "error":
+                print(
+                    f"Illegal character '{m.group()}' at line {lineno}, file {self.file.name if self.from_file else 'string input'}"
+                )
+            else:
+                yield kind, convert[kind](m.group()), lineno, m.start(), m.end()
@@ -1,24 +1,98 @@
-from ftbquest_profiler import FTBQuestProfiler
+from ftbquest_profiler import FTBQuestProfiler, BatchProfiler
 from configparser import ConfigParser
 
+# a [pack.<name>] section sets these [lang] keys under other names, the
+# [ftbquests] keys of the same names being the pack's own
+PACK_LANG_KEYS = {
+    "input_directory": "lang_input_directory",
+    "output_directory": "lang_output_directory",
+}
 
-def main() -> None:
-    conf = ConfigParser()
-    conf.read("config.ini", encoding="utf-8")
-    profiler = FTBQuestProfiler(
-        in_ftbq_dir=conf.get("ftbquests", "input_directory", fallback=""),
-        out_ftbq_dir=conf.get("ftbquests", "output_directory", fallback=""),
-        default_lang=conf.get("ftbquests", "language", fallback=""),
-        in_lang_dir=conf.get("lang", "input_directory", fallback=""),
-        out_lang_dir=conf.get("lang", "output_directory", fallback=""),
-        out_namespace=conf.get("lang", "output_namespace", fallback=""),
-        sort_lang=conf.getboolean("lang", "sort", fallback=True),
+
+def profiler_kwargs(conf: ConfigParser, pack: str = "") -> dict:
+    # the FTBQuestProfiler arguments of the single pack, or of the pack
+    # section pack, whose keys override those of [ftbquests] and [lang]
+    def option(section: str, key: str) -> tuple[str, str]:
+        if pack and section in ("ftbquests", "lang"):
+            pack_key = PACK_LANG_KEYS.get(key, key) if section == "lang" else key
+            if conf.has_option(pack, pack_key):
+                return pack, pack_key
+        return section, key
+
+    return dict(
+        in_ftbq_dir=conf.get(*option("ftbquests", "input_directory"), fallback=""),
+        out_ftbq_dir=conf.get(*option("ftbquests", "output_directory"), fallback=""),
+        default_lang=conf.get(*option("ftbquests", "language"), fallback=""),
+        in_lang_dir=conf.get(*option("lang", "input_directory"), fallback=""),
+        out_lang_dir=conf.get(*option("lang", "output_directory"), fallback=""),
+        out_namespace=conf.get(*option("lang", "output_namespace"), fallback=""),
+        sort_lang=conf.getboolean(*option("lang", "sort"), fallback=True),
         logging=conf.getboolean("general", "logging", fallback=True),
         merge_raw_text=conf.getboolean(
-            "ftbquests", "merge_raw_text", fallback=True
+            *option("ftbquests", "merge_raw_text"), fallback=True
         ),
+        output_format=conf.get(*option("ftbquests", "output_format"), fallback=""),
+        lexer=conf.get("parser", "lexer", fallback=""),
+        engine=conf.get("parser", "engine", fallback=""),
+        jobs=conf.getint("general", "jobs", fallback=1),
+        incremental=conf.getboolean("general", "incremental", fallback=False),
+        report=conf.getboolean("general", "report", fallback=False),
+        cprofile=conf.getboolean("general", "cprofile", fallback=False),
+        lang_layout=conf.get(*option("lang", "layout"), fallback=""),
+        dedup=conf.get(*option("lang", "dedup"), fallback=""),
+        write_mode=conf.get("general", "write_mode", fallback=""),
+        rich_text_cache=conf.getint("parser", "rich_text_cache", fallback=4096),
+        parse_cache_dir=conf.get("parser", "cache_directory", fallback=""),
+        parse_cache_size=conf.getint("parser", "cache_size", fallback=256),
+        include=conf.get(*option("ftbquests", "include"), fallback=""),
+        exclude=conf.get(*option("ftbquests", "exclude"), fallback=""),
     )
-    profiler.profile()
+
+
+def pack_sections(conf: ConfigParser) -> list[str]:
+    # [pack.<name>] sections of config.ini, then of the batch packs_file
+    packs_file = conf.get("batch", "packs_file", fallback="")
+    if packs_file:
+        packs = ConfigParser()
+        if not packs.read(packs_file, encoding="utf-8"):
+            raise FileNotFoundError(f"Batch packs file '{packs_file}' not found.")
+        for section in packs.sections():
+            if section.startswith("pack.") and not conf.has_section(section):
+                conf[section] = packs[section]
+    return [section for section in conf.sections() if section.startswith("pack.")]
+
+
+def main() -> None:
+    conf = ConfigParser()
+    conf.read("config.ini", encoding="utf-8")
+    mode = conf.get("general", "mode", fallback="profile") or "profile"
+    if mode not in ("profile", "bake"):
+        raise ValueError(f"Unknown mode '{mode}'.")
+    if conf.getboolean("batch", "enabled", fallback=False):
+        BatchProfiler(
+            {
+                section[len("pack.") :]: profiler_kwargs(conf, section)
+                for section in pack_sections(conf)
+            },
+            jobs=conf.getint("batch", "jobs", fallback=1),
+            mode=mode,
+            bake_language=conf.get("general", "bake_language", fallback=""),
+            logging=conf.getboolean("general", "logging", fallback=True),
+        ).run()
+        return
+    profiler = FTBQuestProfiler(**profiler_kwargs(conf))
+    if mode == "bake":
+        profiler.bake(conf.get("general", "bake_language", fallback=""))
+    elif conf.getboolean("general", "watch", fallback=False):
+        profiler.watch(
+            interval=conf.getfloat("general", "watch_interval", fallback=1.0)
+        )
+    elif conf.getboolean("general", "async_io", fallback=False):
+        import asyncio
+
+        asyncio.run(profiler.profile_async())
+    else:
+        profiler.profile()
 
 
 if __name__ == "__main__":